@@ -1,10 +1,122 @@
 #!/usr/bin/env python3
 """
 pytest configuration file for Wormhole tests.
+
+The project root is put on sys.path by the `pythonpath` setting in
+pyproject.toml, so wormhole modules can be imported directly.
 """
-import sys
-from pathlib import Path
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+try:
+    import uvloop  # type: ignore[import-not-found]
+except ImportError:
+    uvloop = None  # Optional; the async tests fall back to plain asyncio.
+
+
+class _Resolved:
+    """An awaitable that completes immediately and can be awaited repeatedly."""
+
+    __slots__ = ()
+
+    def __await__(self):
+        return iter(())
+
+
+# Shared result for awaited writer methods, so awaiting them does not
+# create a new coroutine on every call.
+RESOLVED = _Resolved()
+
+
+@pytest.fixture
+def mock_rw():
+    """
+    Create a fresh stream reader/writer pair of mocks.
+
+    The mocks are built without `spec=` to skip introspecting the whole
+    StreamReader/StreamWriter API for every test. The writer's drain() and
+    wait_closed() return the pre-resolved RESOLVED awaitable, so assert on
+    their call counts rather than with assert_awaited_*.
+
+    Returns:
+        tuple[AsyncMock, Mock]: The mock reader and writer.
+    """
+    reader = AsyncMock()
+    reader.at_eof = Mock(return_value=False)
+    writer = Mock()
+    writer.is_closing.return_value = False
+    writer.drain = Mock(return_value=RESOLVED)
+    writer.wait_closed = Mock(return_value=RESOLVED)
+    return reader, writer
+
+
+def _done(value):
+    """
+    Create a future on the running loop that already holds value.
+
+    Args:
+        value: The result the future resolves to.
+
+    Returns:
+        asyncio.Future: The completed future.
+    """
+    future = asyncio.get_running_loop().create_future()
+    future.set_result(value)
+    return future
+
+
+@pytest.fixture
+def done():
+    """
+    Provide the helper that wraps a value in an already completed future.
+
+    Stand-ins built as `lambda *args: done(value)` can replace an AsyncMock
+    for an awaited call whose awaits are never asserted.
+
+    Returns:
+        Callable[[Any], asyncio.Future]: The future factory.
+    """
+    return _done
+
+
+def _assert_wrote(writer: Mock, payload: bytes) -> None:
+    """
+    Check that payload was the last write to writer and that it was drained.
+
+    Compares call_args directly, which skips the message formatting that
+    assert_called_with does up front. The drain() call must come after the
+    last write(), so a write that is never flushed is caught.
+
+    Args:
+        writer (Mock): The mock writer, as built by mock_rw.
+        payload (bytes): The bytes expected in the last write() call.
+    """
+    assert writer.write.call_args.args[0] == payload
+    names = [name for name, _, _ in writer.mock_calls]
+    last_write = len(names) - 1 - names[::-1].index("write")
+    assert "drain" in names[last_write + 1 :], "write() was not drained"
+
+
+@pytest.fixture
+def assert_wrote():
+    """
+    Provide the helper that checks a response was written and drained.
+
+    Returns:
+        Callable[[Mock, bytes], None]: The assertion helper.
+    """
+    return _assert_wrote
+
+
+if uvloop is not None:
+
+    @pytest.fixture(scope="session")
+    def event_loop_policy() -> asyncio.AbstractEventLoopPolicy:
+        """
+        Run the async tests on uvloop, like the proxy does when it is present.
 
-# Add the project root to the path so we can import wormhole modules
-project_root = Path(__file__).parent
-sys.path.insert(0, str(project_root))
+        Returns:
+            asyncio.AbstractEventLoopPolicy: The uvloop event loop policy.
+        """
+        return uvloop.EventLoopPolicy()
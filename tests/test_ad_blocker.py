@@ -69,6 +69,23 @@ example.org
         assert "tracker.com" in domains
         assert "example.org" in domains
 
+    def test_parse_domains_from_content_crlf(self):
+        """Test parsing domains from content with CRLF line endings."""
+        content = (
+            "# Comment line\r\n"
+            "0.0.0.0 Ads.Example.com #inline\r\n"
+            "  ||tracker.com^$third-party\r\n"
+            "plain.example.org\t\r\n"
+            "not a domain.com\r\n"
+        )
+
+        domains = _parse_domains_from_content(content)
+        assert domains == {
+            "ads.example.com",
+            "tracker.com",
+            "plain.example.org",
+        }
+
     def test_filter_redundant_domains(self):
         """Test filtering redundant subdomains."""
         domains = {
@@ -50,27 +50,18 @@ class TestAuthManager:
                 # Just check that write was called, not the exact message
                 mock_stderr.write.assert_called()
 
-    def test_secure_create_file_posix(self):
+    def test_secure_create_file_posix(self, tmp_path):
         """Test _secure_create_file on POSIX systems."""
+        auth_path = tmp_path / "auth"
         with patch("sys.platform", "linux"):
-            with tempfile.NamedTemporaryFile(delete=False) as tmp:
-                tmp_path = Path(tmp.name)
+            result = _secure_create_file(auth_path)
+            assert result is True
+            assert auth_path.exists()
 
-            try:
-                # Remove the file so we can create it
-                os.remove(tmp_path)
-
-                result = _secure_create_file(tmp_path)
-                assert result is True
-                assert tmp_path.exists()
-
-                # Check permissions (0600)
-                if hasattr(os, "stat") and hasattr(os, "chmod"):
-                    stat_info = os.stat(tmp_path)
-                    assert stat.S_IMODE(stat_info.st_mode) == 0o600
-            finally:
-                if tmp_path.exists():
-                    os.remove(tmp_path)
+            # Check permissions (0600)
+            if hasattr(os, "stat") and hasattr(os, "chmod"):
+                stat_info = os.stat(auth_path)
+                assert stat.S_IMODE(stat_info.st_mode) == 0o600
 
     def test_secure_create_file_posix_error(self):
         """Test _secure_create_file on POSIX systems when there's an error."""
@@ -81,66 +72,50 @@ class TestAuthManager:
                     assert result is False
                     mock_stderr.write.assert_called()
 
-    def test_read_auth_file_exists(self):
+    def test_read_auth_file_exists(self, tmp_path):
         """Test _read_auth_file when the file exists."""
-        content = "user1:realm1:hash1\nuser2:realm2:hash2\n"
-        with tempfile.NamedTemporaryFile(mode="w", delete=False) as tmp:
-            tmp.write(content)
-            tmp_path = Path(tmp.name)
+        auth_path = tmp_path / "auth"
+        auth_path.write_text("user1:realm1:hash1\nuser2:realm2:hash2\n")
 
-        try:
-            users = _read_auth_file(tmp_path)
-            assert len(users) == 2
-            assert users["user1"]["realm"] == "realm1"
-            assert users["user1"]["hash"] == "hash1"
-            assert users["user2"]["realm"] == "realm2"
-            assert users["user2"]["hash"] == "hash2"
-        finally:
-            os.remove(tmp_path)
+        users = _read_auth_file(auth_path)
+        assert len(users) == 2
+        assert users["user1"]["realm"] == "realm1"
+        assert users["user1"]["hash"] == "hash1"
+        assert users["user2"]["realm"] == "realm2"
+        assert users["user2"]["hash"] == "hash2"
 
     def test_read_auth_file_not_exists(self):
         """Test _read_auth_file when the file doesn't exist."""
         users = _read_auth_file(Path("/nonexistent/file"))
         assert users == {}
 
-    def test_read_auth_file_malformed_line(self):
+    def test_read_auth_file_malformed_line(self, tmp_path):
         """Test _read_auth_file when there are malformed lines."""
-        content = "user1:realm1:hash1\nmalformed_line\nuser2:realm2:hash2\n"
-        with tempfile.NamedTemporaryFile(mode="w", delete=False) as tmp:
-            tmp.write(content)
-            tmp_path = Path(tmp.name)
-
-        try:
-            users = _read_auth_file(tmp_path)
-            assert len(users) == 2  # Should ignore malformed line
-            assert "user1" in users
-            assert "user2" in users
-        finally:
-            os.remove(tmp_path)
+        auth_path = tmp_path / "auth"
+        auth_path.write_text(
+            "user1:realm1:hash1\nmalformed_line\nuser2:realm2:hash2\n"
+        )
 
-    def test_write_auth_file(self):
+        users = _read_auth_file(auth_path)
+        assert len(users) == 2  # Should ignore malformed line
+        assert "user1" in users
+        assert "user2" in users
+
+    def test_write_auth_file(self, tmp_path):
         """Test _write_auth_file."""
         users = {
             "user1": {"realm": "realm1", "hash": "hash1"},
             "user2": {"realm": "realm2", "hash": "hash2"},
         }
+        auth_path = tmp_path / "auth"
 
-        with tempfile.NamedTemporaryFile(delete=False) as tmp:
-            tmp_path = Path(tmp.name)
-
-        try:
-            _write_auth_file(tmp_path, users)
-
-            # Read back and verify
-            with open(tmp_path, "r") as f:
-                content = f.read()
+        _write_auth_file(auth_path, users)
 
-            lines = content.strip().split("\n")
-            assert len(lines) == 2
-            assert "user1:realm1:hash1" in lines
-            assert "user2:realm2:hash2" in lines
-        finally:
-            os.remove(tmp_path)
+        # Read back and verify
+        lines = auth_path.read_text().strip().split("\n")
+        assert len(lines) == 2
+        assert "user1:realm1:hash1" in lines
+        assert "user2:realm2:hash2" in lines
 
     def test_add_user_new_file(self):
         """Test add_user when creating a new auth file."""
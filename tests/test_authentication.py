@@ -3,62 +3,181 @@
 Unit tests for the authentication module.
 """
 import pytest
-import asyncio
-import tempfile
 import os
 from pathlib import Path
-from unittest.mock import AsyncMock, Mock, patch
+from unittest.mock import Mock, patch
 from wormhole.authentication import (
     get_ident,
     _load_auth_file,
     _parse_digest_header,
+    _compute_ha2,
     send_auth_required_response,
     verify_credentials,
     REALM,
     HASH_ALGORITHM,
+    _DUMMY_HA1,
 )
 
+VALID_USERNAME = "testuser"
+VALID_PASSWORD = "testpassword"
+VALID_HA1 = HASH_ALGORITHM(
+    f"{VALID_USERNAME}:{REALM}:{VALID_PASSWORD}".encode("utf-8")
+).hexdigest()
+VALID_HA2 = HASH_ALGORITHM(b"CONNECT:/").hexdigest()
+VALID_RESPONSE = HASH_ALGORITHM(
+    f"{VALID_HA1}:abc123:00000001:xyz789:auth:{VALID_HA2}".encode("utf-8")
+).hexdigest()
+
+CLIENT_PEER = ("192.168.1.100", 12345)
+
+# Proxy-Authorization headers shared by the verify_credentials tests
+AUTH_HEADER_VALID = (
+    "Proxy-Authorization: Digest "
+    f'username="{VALID_USERNAME}", '
+    f'realm="{REALM}", '
+    'nonce="abc123", '
+    'uri="/", '
+    'qop="auth", '
+    'nc="00000001", '
+    'cnonce="xyz789", '
+    f'response="{VALID_RESPONSE}"'
+)
+AUTH_HEADER_INVALID = (
+    "Proxy-Authorization: Digest "
+    'username="testuser", '
+    f'realm="{REALM}", '
+    'nonce="abc123", '
+    'uri="/", '
+    'response="invalidresponse"'
+)
+AUTH_HEADER_UNKNOWN_USER = (
+    "Proxy-Authorization: Digest "
+    'username="testuser", '
+    f'realm="{REALM}", '
+    'nonce="abc123", '
+    'uri="/", '
+    'qop="auth", '
+    'nc="00000001", '
+    'cnonce="xyz789", '
+    'response="invalidresponse"'
+)
+# A response forged against the public stand-in HA1 used for unknown users
+DUMMY_HA1_RESPONSE = HASH_ALGORITHM(
+    f"{_DUMMY_HA1}:abc123:00000001:xyz789:auth:{VALID_HA2}".encode("utf-8")
+).hexdigest()
+AUTH_HEADER_DUMMY_HA1 = (
+    "Proxy-Authorization: Digest "
+    'username="testuser", '
+    f'realm="{REALM}", '
+    'nonce="abc123", '
+    'uri="/", '
+    'qop="auth", '
+    'nc="00000001", '
+    'cnonce="xyz789", '
+    f'response="{DUMMY_HA1_RESPONSE}"'
+)
+AUTH_HEADER_NON_ASCII = (
+    "Proxy-Authorization: Digest "
+    'username="testuser", '
+    f'realm="{REALM}", '
+    'nonce="abc123", '
+    'uri="/", '
+    'qop="auth", '
+    'nc="00000001", '
+    'cnonce="xyz789", '
+    'response="café"'
+)
+
+
+def _write_auth_file(tmp_path_factory, content: str) -> Path:
+    """Write an auth file once into a fresh temporary directory."""
+    path = tmp_path_factory.mktemp("auth") / "authfile"
+    path.write_text(content)
+    return path
+
+
+@pytest.fixture(scope="module")
+def auth_file_testuser(tmp_path_factory):
+    """Auth file containing a single 'testuser' entry."""
+    return _write_auth_file(tmp_path_factory, "testuser:testrealm:testhash\n")
+
+
+@pytest.fixture(scope="module")
+def auth_file_otheruser(tmp_path_factory):
+    """Auth file containing a single 'otheruser' entry."""
+    return _write_auth_file(tmp_path_factory, "otheruser:testrealm:testhash\n")
+
+
+@pytest.fixture(scope="module")
+def auth_file_two_users(tmp_path_factory):
+    """Auth file containing two well-formed entries."""
+    return _write_auth_file(
+        tmp_path_factory, "user1:realm1:hash1\nuser2:realm2:hash2\n"
+    )
+
+
+@pytest.fixture(scope="module")
+def auth_file_malformed(tmp_path_factory):
+    """Auth file with a malformed line between two valid entries."""
+    return _write_auth_file(
+        tmp_path_factory,
+        "user1:realm1:hash1\nmalformed_line\nuser2:realm2:hash2\n",
+    )
+
+
+@pytest.fixture(scope="module")
+def auth_file_valid(tmp_path_factory):
+    """Auth file holding the real HA1 hash for VALID_USERNAME."""
+    return _write_auth_file(
+        tmp_path_factory, f"{VALID_USERNAME}:{REALM}:{VALID_HA1}\n"
+    )
+
+
+@pytest.fixture
+def mock_rw_with_peer(mock_rw):
+    """Reader/writer mocks whose writer reports CLIENT_PEER as its peer."""
+    reader, writer = mock_rw
+    writer.get_extra_info = Mock(return_value=CLIENT_PEER)
+    return reader, writer
+
+
+@pytest.fixture
+def missing_auth_file(tmp_path):
+    """Path to an auth file that does not exist, private to each test."""
+    return tmp_path / "missing" / "authfile"
+
 
 class TestAuthentication:
     """Test cases for the authentication module."""
 
-    def test_get_ident_without_user(self):
+    def test_get_ident_without_user(self, mock_rw_with_peer):
         """Test get_ident without a user."""
         # Create mock reader and writer
-        mock_reader = Mock(spec=asyncio.StreamReader)
-        mock_writer = Mock(spec=asyncio.StreamWriter)
-
-        # Mock the peername
-        mock_writer.get_extra_info.return_value = ("192.168.1.100", 12345)
+        mock_reader, mock_writer = mock_rw_with_peer
 
         ident = get_ident(mock_reader, mock_writer)
 
         # Verify the ident dictionary
         assert "id" in ident
-        assert ident["client"] == "192.168.1.100"
+        assert ident["client"] == CLIENT_PEER[0]
         assert len(ident["id"]) == 6  # Should be 6 hex characters
 
-    def test_get_ident_with_user(self):
+    def test_get_ident_with_user(self, mock_rw_with_peer):
         """Test get_ident with a user."""
         # Create mock reader and writer
-        mock_reader = Mock(spec=asyncio.StreamReader)
-        mock_writer = Mock(spec=asyncio.StreamWriter)
-
-        # Mock the peername
-        mock_writer.get_extra_info.return_value = ("192.168.1.100", 12345)
+        mock_reader, mock_writer = mock_rw_with_peer
 
         ident = get_ident(mock_reader, mock_writer, "testuser")
 
         # Verify the ident dictionary
         assert "id" in ident
-        assert ident["client"] == "testuser@192.168.1.100"
+        assert ident["client"] == f"testuser@{CLIENT_PEER[0]}"
         assert len(ident["id"]) == 6  # Should be 6 hex characters
 
-    def test_get_ident_unknown_peer(self):
+    def test_get_ident_unknown_peer(self, mock_rw):
         """Test get_ident when peername is unknown."""
         # Create mock reader and writer
-        mock_reader = Mock(spec=asyncio.StreamReader)
-        mock_writer = Mock(spec=asyncio.StreamWriter)
+        mock_reader, mock_writer = mock_rw
 
         # Mock the peername as None
         mock_writer.get_extra_info.return_value = None
@@ -70,86 +189,125 @@ class TestAuthentication:
         assert ident["client"] == "unknown"
         assert len(ident["id"]) == 6  # Should be 6 hex characters
 
-    def test_parse_digest_header_quoted_values(self):
-        """Test _parse_digest_header with quoted values."""
-        header = (
-            'Digest username="testuser", realm="Wormhole Proxy", nonce="abc123"'
-        )
-        result = _parse_digest_header(header)
-
-        assert result["username"] == "testuser"
-        assert result["realm"] == "Wormhole Proxy"
-        assert result["nonce"] == "abc123"
-
-    def test_parse_digest_header_unquoted_values(self):
-        """Test _parse_digest_header with unquoted values."""
-        header = "Digest username=testuser, realm=WormholeProxy, nonce=abc123"
-        result = _parse_digest_header(header)
-
-        assert result["username"] == "testuser"
-        assert result["realm"] == "WormholeProxy"
-        assert result["nonce"] == "abc123"
-
-    def test_parse_digest_header_mixed_values(self):
-        """Test _parse_digest_header with mixed quoted and unquoted values."""
-        header = 'Digest username="testuser", realm=WormholeProxy, nonce=abc123'
-        result = _parse_digest_header(header)
-
-        assert result["username"] == "testuser"
-        assert result["realm"] == "WormholeProxy"
-        assert result["nonce"] == "abc123"
-
-    def test_load_auth_file_exists(self):
+    @pytest.mark.parametrize(
+        "header,expected",
+        [
+            (
+                'Digest username="testuser", realm="Wormhole Proxy", nonce="abc123"',
+                {
+                    "username": "testuser",
+                    "realm": "Wormhole Proxy",
+                    "nonce": "abc123",
+                },
+            ),
+            (
+                "Digest username=testuser, realm=WormholeProxy, nonce=abc123",
+                {
+                    "username": "testuser",
+                    "realm": "WormholeProxy",
+                    "nonce": "abc123",
+                },
+            ),
+            (
+                'Digest username="testuser", realm=WormholeProxy, nonce=abc123',
+                {
+                    "username": "testuser",
+                    "realm": "WormholeProxy",
+                    "nonce": "abc123",
+                },
+            ),
+        ],
+        ids=["quoted", "unquoted", "mixed"],
+    )
+    def test_parse_digest_header(self, header, expected):
+        """Test _parse_digest_header with quoted, unquoted and mixed values."""
+        assert _parse_digest_header(header) == expected
+
+    def test_compute_ha2(self):
+        """Test _compute_ha2 hashes method and URI."""
+        expected = HASH_ALGORITHM(b"CONNECT:example.com:443").hexdigest()
+        assert _compute_ha2("CONNECT", "example.com:443") == expected
+        # A repeated call is served from the cache
+        assert _compute_ha2("CONNECT", "example.com:443") == expected
+        assert _compute_ha2.cache_info().hits >= 1
+
+    def test_load_auth_file_exists(self, auth_file_two_users):
         """Test _load_auth_file when the file exists."""
-        content = "user1:realm1:hash1\nuser2:realm2:hash2\n"
-        with tempfile.NamedTemporaryFile(mode="w", delete=False) as tmp:
-            tmp.write(content)
-            tmp_path = Path(tmp.name)
-
-        try:
-            users = _load_auth_file(tmp_path)
-            assert users is not None
-            assert len(users) == 2
-            assert users["user1"]["realm"] == "realm1"
-            assert users["user1"]["hash"] == "hash1"
-            assert users["user2"]["realm"] == "realm2"
-            assert users["user2"]["hash"] == "hash2"
-        finally:
-            os.remove(tmp_path)
-
-    def test_load_auth_file_not_exists(self):
+        users = _load_auth_file(auth_file_two_users)
+        assert users is not None
+        assert len(users) == 2
+        assert users["user1"]["realm"] == "realm1"
+        assert users["user1"]["hash"] == "hash1"
+        assert users["user2"]["realm"] == "realm2"
+        assert users["user2"]["hash"] == "hash2"
+
+    def test_load_auth_file_not_exists(self, missing_auth_file):
         """Test _load_auth_file when the file doesn't exist."""
-        users = _load_auth_file(Path("/nonexistent/file"))
+        users = _load_auth_file(missing_auth_file)
         assert users is None
 
-    def test_load_auth_file_malformed_line(self):
+    def test_load_auth_file_malformed_line(self, auth_file_malformed):
         """Test _load_auth_file when there are malformed lines."""
-        content = "user1:realm1:hash1\nmalformed_line\nuser2:realm2:hash2\n"
-        with tempfile.NamedTemporaryFile(mode="w", delete=False) as tmp:
-            tmp.write(content)
-            tmp_path = Path(tmp.name)
-
-        try:
-            users = _load_auth_file(tmp_path)
-            assert users is not None
-            assert len(users) == 2  # Should ignore malformed line
-            assert "user1" in users
-            assert "user2" in users
-        finally:
-            os.remove(tmp_path)
-
-    @pytest.mark.asyncio
-    async def test_send_auth_required_response(self):
+        users = _load_auth_file(auth_file_malformed)
+        assert users is not None
+        assert len(users) == 2  # Should ignore malformed line
+        assert "user1" in users
+        assert "user2" in users
+
+    def test_load_auth_file_whitespace_and_colons(self, tmp_path):
+        """Test _load_auth_file trims whitespace and keeps colons in the hash."""
+        auth_path = tmp_path / "authfile"
+        auth_path.write_text(
+            "\n  user1:realm1:hash:with:colons  \n\t\nuser2:realm2:hash2"
+        )
+
+        users = _load_auth_file(auth_path)
+        assert users == {
+            "user1": {"realm": "realm1", "hash": "hash:with:colons"},
+            "user2": {"realm": "realm2", "hash": "hash2"},
+        }
+
+    def test_load_auth_file_cache_hit(self, tmp_path):
+        """Test _load_auth_file only re-reads the file after it changes."""
+        auth_path = tmp_path / "authfile"
+        auth_path.write_text("user1:realm1:hash1\n")
+
+        with patch("builtins.open", side_effect=open) as mock_open:
+            first = _load_auth_file(auth_path)
+            second = _load_auth_file(auth_path)
+            assert mock_open.call_count == 1
+            assert first == {"user1": {"realm": "realm1", "hash": "hash1"}}
+            assert second == first
+
+            # A new modification time invalidates the cached parse
+            os.utime(auth_path, ns=(0, 0))
+            _load_auth_file(auth_path)
+            assert mock_open.call_count == 2
+
+    def test_load_auth_file_cached_per_path(self, tmp_path):
+        """Test _load_auth_file keeps separate cache entries per file."""
+        first_path = tmp_path / "first"
+        first_path.write_text("user1:realm1:hash1\n")
+        second_path = tmp_path / "second"
+        second_path.write_text("user2:realm2:hash2\n")
+        # Make the second file older than the first one
+        os.utime(second_path, ns=(0, 0))
+
+        assert "user1" in _load_auth_file(first_path)
+        assert list(_load_auth_file(second_path)) == ["user2"]
+        assert list(_load_auth_file(first_path)) == ["user1"]
+
+    async def test_send_auth_required_response(self, mock_rw):
         """Test send_auth_required_response."""
         # Create a mock writer
-        mock_writer = AsyncMock(spec=asyncio.StreamWriter)
+        _, mock_writer = mock_rw
 
         # Call the function
         await send_auth_required_response(mock_writer)
 
         # Verify the writer was called correctly
         mock_writer.write.assert_called_once()
-        mock_writer.drain.assert_awaited_once()
+        mock_writer.drain.assert_called_once()
 
         # Verify the response contains the expected elements
         call_args = mock_writer.write.call_args[0][0]
@@ -161,44 +319,35 @@ class TestAuthentication:
         assert b"nonce=" in call_args
         assert b"opaque=" in call_args
 
-    @pytest.mark.asyncio
-    async def test_verify_credentials_no_auth_header(self):
+    async def test_verify_credentials_no_auth_header(
+        self, mock_rw, auth_file_testuser
+    ):
         """Test verify_credentials when no auth header is provided."""
         # Create mock reader and writer
-        mock_reader = AsyncMock(spec=asyncio.StreamReader)
-        mock_writer = AsyncMock(spec=asyncio.StreamWriter)
-
-        # Create a temporary auth file
-        content = "testuser:testrealm:testhash\n"
-        with tempfile.NamedTemporaryFile(mode="w", delete=False) as tmp:
-            tmp.write(content)
-            tmp_path = tmp.name
-
-        try:
-            # Call verify_credentials without an auth header
-            result = await verify_credentials(
-                mock_reader,
-                mock_writer,
-                "CONNECT",
-                [],  # Empty headers
-                tmp_path,
-            )
-
-            # Should return None
-            assert result is None
-
-            # Should have sent an auth required response
-            mock_writer.write.assert_called_once()
-            mock_writer.drain.assert_awaited_once()
-        finally:
-            os.remove(tmp_path)
-
-    @pytest.mark.asyncio
-    async def test_verify_credentials_no_auth_file(self):
+        mock_reader, mock_writer = mock_rw
+
+        # Call verify_credentials without an auth header
+        result = await verify_credentials(
+            mock_reader,
+            mock_writer,
+            "CONNECT",
+            [],  # Empty headers
+            str(auth_file_testuser),
+        )
+
+        # Should return None
+        assert result is None
+
+        # Should have sent an auth required response
+        mock_writer.write.assert_called_once()
+        mock_writer.drain.assert_called_once()
+
+    async def test_verify_credentials_no_auth_file(
+        self, mock_rw, missing_auth_file
+    ):
         """Test verify_credentials when no auth file exists."""
         # Create mock reader and writer
-        mock_reader = AsyncMock(spec=asyncio.StreamReader)
-        mock_writer = AsyncMock(spec=asyncio.StreamWriter)
+        mock_reader, mock_writer = mock_rw
 
         # Call verify_credentials with a nonexistent auth file
         result = await verify_credentials(
@@ -206,7 +355,7 @@ class TestAuthentication:
             mock_writer,
             "CONNECT",
             [],  # Empty headers
-            "/nonexistent/authfile",
+            str(missing_auth_file),
         )
 
         # Should return None
@@ -214,183 +363,145 @@ class TestAuthentication:
 
         # Should have sent an auth required response
         mock_writer.write.assert_called_once()
-        mock_writer.drain.assert_awaited_once()
+        mock_writer.drain.assert_called_once()
 
-    @pytest.mark.asyncio
-    async def test_verify_credentials_invalid_auth_header(self):
+    async def test_verify_credentials_invalid_auth_header(
+        self, mock_rw, auth_file_testuser
+    ):
         """Test verify_credentials with an invalid auth header."""
         # Create mock reader and writer
-        mock_reader = AsyncMock(spec=asyncio.StreamReader)
-        mock_writer = AsyncMock(spec=asyncio.StreamWriter)
-
-        # Create a temporary auth file
-        content = "testuser:testrealm:testhash\n"
-        with tempfile.NamedTemporaryFile(mode="w", delete=False) as tmp:
-            tmp.write(content)
-            tmp_path = tmp.name
-
-        try:
-            # Call verify_credentials with an invalid auth header
-            result = await verify_credentials(
-                mock_reader,
-                mock_writer,
-                "CONNECT",
-                ["Proxy-Authorization: InvalidHeader"],  # Invalid header
-                tmp_path,
-            )
-
-            # Should return None
-            assert result is None
-
-            # Should have sent an auth required response
-            mock_writer.write.assert_called_once()
-            mock_writer.drain.assert_awaited_once()
-        finally:
-            os.remove(tmp_path)
-
-    @pytest.mark.asyncio
-    async def test_verify_credentials_user_not_found(self):
+        mock_reader, mock_writer = mock_rw
+
+        # Call verify_credentials with an invalid auth header
+        result = await verify_credentials(
+            mock_reader,
+            mock_writer,
+            "CONNECT",
+            ["Proxy-Authorization: InvalidHeader"],  # Invalid header
+            str(auth_file_testuser),
+        )
+
+        # Should return None
+        assert result is None
+
+        # Should have sent an auth required response
+        mock_writer.write.assert_called_once()
+        mock_writer.drain.assert_called_once()
+
+    async def test_verify_credentials_user_not_found(
+        self, mock_rw, auth_file_otheruser
+    ):
         """Test verify_credentials when user is not found."""
         # Create mock reader and writer
-        mock_reader = AsyncMock(spec=asyncio.StreamReader)
-        mock_writer = AsyncMock(spec=asyncio.StreamWriter)
-
-        # Create a temporary auth file with a different user
-        content = "otheruser:testrealm:testhash\n"
-        with tempfile.NamedTemporaryFile(mode="w", delete=False) as tmp:
-            tmp.write(content)
-            tmp_path = tmp.name
-
-        try:
-            # Create a valid-looking auth header for a different user
-            auth_header = (
-                "Proxy-Authorization: Digest "
-                'username="testuser", '
-                f'realm="{REALM}", '
-                'nonce="abc123", '
-                'uri="/", '
-                'response="invalidresponse"'
-            )
-
-            # Call verify_credentials
-            result = await verify_credentials(
-                mock_reader, mock_writer, "CONNECT", [auth_header], tmp_path
-            )
-
-            # Should return None
-            assert result is None
-
-            # Should have sent an auth required response
-            mock_writer.write.assert_called_once()
-            mock_writer.drain.assert_awaited_once()
-        finally:
-            os.remove(tmp_path)
-
-    @pytest.mark.asyncio
-    async def test_verify_credentials_valid_credentials(self):
+        mock_reader, mock_writer = mock_rw
+
+        # Call verify_credentials with a header for a user not in the file
+        result = await verify_credentials(
+            mock_reader,
+            mock_writer,
+            "CONNECT",
+            [AUTH_HEADER_UNKNOWN_USER],
+            str(auth_file_otheruser),
+        )
+
+        # Should return None
+        assert result is None
+
+        # Should have sent an auth required response
+        mock_writer.write.assert_called_once()
+        mock_writer.drain.assert_called_once()
+
+    async def test_verify_credentials_unknown_user_dummy_ha1(
+        self, mock_rw, auth_file_otheruser
+    ):
+        """Test that a response forged against the dummy HA1 is rejected."""
+        mock_reader, mock_writer = mock_rw
+
+        # The response matches what the server computes for an unknown user
+        result = await verify_credentials(
+            mock_reader,
+            mock_writer,
+            "CONNECT",
+            [AUTH_HEADER_DUMMY_HA1],
+            str(auth_file_otheruser),
+        )
+
+        # Should return None
+        assert result is None
+
+        # Should have sent an auth required response
+        mock_writer.write.assert_called_once()
+        call_args = mock_writer.write.call_args[0][0]
+        assert b"HTTP/1.1 407 Proxy Authentication Required" in call_args
+
+    async def test_verify_credentials_valid_credentials(
+        self, mock_rw_with_peer, auth_file_valid
+    ):
         """Test verify_credentials with valid credentials."""
         # Create mock reader and writer
-        mock_reader = AsyncMock(spec=asyncio.StreamReader)
-        mock_writer = AsyncMock(spec=asyncio.StreamWriter)
-        mock_writer.get_extra_info.return_value = ("192.168.1.100", 12345)
-
-        # Create test credentials
-        username = "testuser"
-        password = "testpassword"
-
-        # Calculate the expected HA1 hash
-        ha1_data = f"{username}:{REALM}:{password}".encode("utf-8")
-        ha1 = HASH_ALGORITHM(ha1_data).hexdigest()
-
-        # Create a temporary auth file with the user
-        content = f"{username}:{REALM}:{ha1}\n"
-        with tempfile.NamedTemporaryFile(mode="w", delete=False) as tmp:
-            tmp.write(content)
-            tmp_path = tmp.name
-
-        try:
-            # Create a valid auth header
-            auth_header = (
-                "Proxy-Authorization: Digest "
-                f'username="{username}", '
-                f'realm="{REALM}", '
-                'nonce="abc123", '
-                'uri="/", '
-                'qop="auth", '
-                'nc="00000001", '
-                'cnonce="xyz789", '
-                'response="calculatedresponse"'
-            )
-
-            # Calculate the expected response
-            ha2_data = f"CONNECT:/".encode("utf-8")
-            ha2 = HASH_ALGORITHM(ha2_data).hexdigest()
-            response_data = f"{ha1}:abc123:00000001:xyz789:auth:{ha2}".encode(
-                "utf-8"
-            )
-            expected_response = HASH_ALGORITHM(response_data).hexdigest()
-
-            # Update the auth header with the correct response
-            auth_header = auth_header.replace(
-                'response="calculatedresponse"',
-                f'response="{expected_response}"',
-            )
-
-            # Patch secrets.compare_digest to return True for our test
-            with patch(
-                "wormhole.authentication.secrets.compare_digest",
-                return_value=True,
-            ):
-                # Call verify_credentials
-                result = await verify_credentials(
-                    mock_reader, mock_writer, "CONNECT", [auth_header], tmp_path
-                )
-
-                # Should return an ident dictionary
-                assert result is not None
-                assert "id" in result
-                assert result["client"] == f"{username}@192.168.1.100"
-
-                # Writer should not have been called to send auth required response
-                mock_writer.write.assert_not_called()
-                mock_writer.drain.assert_not_called()
-        finally:
-            os.remove(tmp_path)
-
-    @pytest.mark.asyncio
-    async def test_verify_credentials_invalid_credentials(self):
+        mock_reader, mock_writer = mock_rw_with_peer
+
+        # Call verify_credentials with a correctly computed response
+        result = await verify_credentials(
+            mock_reader,
+            mock_writer,
+            "CONNECT",
+            [AUTH_HEADER_VALID],
+            str(auth_file_valid),
+        )
+
+        # Should return an ident dictionary
+        assert result is not None
+        assert "id" in result
+        assert result["client"] == f"{VALID_USERNAME}@{CLIENT_PEER[0]}"
+
+        # Writer should not have been called to send auth required response
+        mock_writer.write.assert_not_called()
+        mock_writer.drain.assert_not_called()
+
+    async def test_verify_credentials_invalid_credentials(
+        self, mock_rw, auth_file_testuser
+    ):
         """Test verify_credentials with invalid credentials."""
         # Create mock reader and writer
-        mock_reader = AsyncMock(spec=asyncio.StreamReader)
-        mock_writer = AsyncMock(spec=asyncio.StreamWriter)
-
-        # Create a temporary auth file with a user
-        content = "testuser:testrealm:testhash\n"
-        with tempfile.NamedTemporaryFile(mode="w", delete=False) as tmp:
-            tmp.write(content)
-            tmp_path = tmp.name
-
-        try:
-            # Create an auth header with incorrect credentials
-            auth_header = (
-                "Proxy-Authorization: Digest "
-                'username="testuser", '
-                f'realm="{REALM}", '
-                'nonce="abc123", '
-                'uri="/", '
-                'response="invalidresponse"'
-            )
-
-            # Call verify_credentials
-            result = await verify_credentials(
-                mock_reader, mock_writer, "CONNECT", [auth_header], tmp_path
-            )
-
-            # Should return None
-            assert result is None
-
-            # Should have sent an auth required response
-            mock_writer.write.assert_called_once()
-            mock_writer.drain.assert_awaited_once()
-        finally:
-            os.remove(tmp_path)
+        mock_reader, mock_writer = mock_rw
+
+        # Call verify_credentials with incorrect credentials
+        result = await verify_credentials(
+            mock_reader,
+            mock_writer,
+            "CONNECT",
+            [AUTH_HEADER_INVALID],
+            str(auth_file_testuser),
+        )
+
+        # Should return None
+        assert result is None
+
+        # Should have sent an auth required response
+        mock_writer.write.assert_called_once()
+        mock_writer.drain.assert_called_once()
+
+    async def test_verify_credentials_non_ascii_response(
+        self, mock_rw, auth_file_testuser
+    ):
+        """Test verify_credentials with a non-ASCII response value."""
+        # Create mock reader and writer
+        mock_reader, mock_writer = mock_rw
+
+        # Call verify_credentials with a non-ASCII response, should not
+        # raise TypeError
+        result = await verify_credentials(
+            mock_reader,
+            mock_writer,
+            "CONNECT",
+            [AUTH_HEADER_NON_ASCII],
+            str(auth_file_testuser),
+        )
+
+        # Should return None
+        assert result is None
+
+        # Should have sent an auth required response
+        mock_writer.write.assert_called_once()
+        mock_writer.drain.assert_called_once()
@@ -3,7 +3,7 @@
 Unit tests for the RequestContext class.
 """
 import pytest
-import time
+from unittest.mock import patch
 from wormhole.context import RequestContext
 
 
@@ -33,11 +33,13 @@ class TestRequestContext:
         ident = {"id": "test123", "client": "127.0.0.1"}
         context = RequestContext(ident)
 
-        # Small delay
-        time.sleep(0.01)
-
-        elapsed = context.get_elapsed_time()
-        assert elapsed > 0.01
+        # Advance the clock instead of sleeping
+        with patch(
+            "wormhole.context.time.monotonic_ns",
+            return_value=context._start_ns + 50_000_000,
+        ):
+            elapsed = context.get_elapsed_time()
+        assert elapsed == pytest.approx(0.05)
 
     def test_missing_client_ip(self):
         """Test that context handles missing client IP gracefully."""
@@ -45,3 +47,12 @@ class TestRequestContext:
         context = RequestContext(ident)
 
         assert context.client_ip == "unknown"
+
+    def test_contexts_compare_by_identity(self):
+        """Test that contexts with equal fields stay distinct and hashable."""
+        ident = {"id": "test123", "client": "127.0.0.1"}
+        first = RequestContext(ident)
+        second = RequestContext(ident)
+
+        assert first != second
+        assert len({first, second}) == 2
@@ -6,7 +6,10 @@ import pytest
 import asyncio
 from unittest.mock import AsyncMock, Mock, patch
 from wormhole.context import RequestContext
-from wormhole.handler import _create_fastest_connection
+from wormhole.handler import (
+    _create_fastest_connection,
+    _resolve_and_validate_host,
+)
 
 
 class TestCreateFastestConnection:
@@ -18,34 +21,27 @@ class TestCreateFastestConnection:
         ident = {"id": "test123", "client": "127.0.0.1"}
         return RequestContext(ident, verbose=1)
 
-    @pytest.mark.asyncio
-    async def test_create_fastest_connection_success(self, context):
+    async def test_create_fastest_connection_success(self, context, mock_rw):
         """Test successful creation of fastest connection."""
         ip_list = ["93.184.216.34"]  # example.com
         port = 80
 
         # Mock asyncio.open_connection to return mock reader and writer
-        mock_reader = AsyncMock(spec=asyncio.StreamReader)
-        mock_writer = Mock(spec=asyncio.StreamWriter)
+        mock_reader, mock_writer = mock_rw
         mock_writer.get_extra_info.return_value = ("93.184.216.34", 80)
 
         with patch(
             "wormhole.handler.asyncio.open_connection",
             new=AsyncMock(return_value=(mock_reader, mock_writer)),
         ):
-            with patch(
-                "wormhole.handler.asyncio.wait_for",
-                new=AsyncMock(return_value=(mock_reader, mock_writer)),
-            ):
-                reader, writer = await _create_fastest_connection(
-                    ip_list, port, context, timeout=5, max_attempts=1
-                )
+            reader, writer = await _create_fastest_connection(
+                ip_list, port, context, timeout=5, max_attempts=1
+            )
 
-                # Should return the mock reader and writer
-                assert reader == mock_reader
-                assert writer == mock_writer
+            # Should return the mock reader and writer
+            assert reader == mock_reader
+            assert writer == mock_writer
 
-    @pytest.mark.asyncio
     async def test_create_fastest_connection_failure(self, context):
         """Test failure to create connection."""
         ip_list = ["93.184.216.34"]  # example.com
@@ -56,13 +52,89 @@ class TestCreateFastestConnection:
             "wormhole.handler.asyncio.open_connection",
             new=AsyncMock(side_effect=OSError("Connection failed")),
         ):
-            with patch(
-                "wormhole.handler.asyncio.wait_for",
-                new=AsyncMock(side_effect=OSError("Connection failed")),
-            ):
-                with pytest.raises(OSError) as exc_info:
-                    await _create_fastest_connection(
-                        ip_list, port, context, timeout=1, max_attempts=1
-                    )
-
-                assert "All connection attempts failed" in str(exc_info.value)
+            with pytest.raises(OSError) as exc_info:
+                await _create_fastest_connection(
+                    ip_list, port, context, timeout=1, max_attempts=1
+                )
+
+            assert "All connection attempts failed" in str(exc_info.value)
+
+    async def test_create_fastest_connection_staggers_attempts(
+        self, context, mock_rw, monkeypatch
+    ):
+        """Test that a stalled IP only delays the next one by the head start."""
+        ip_list = ["192.0.2.1", "93.184.216.34"]
+        mock_reader, mock_writer = mock_rw
+        mock_writer.get_extra_info.return_value = ("93.184.216.34", 80)
+        monkeypatch.setattr("wormhole.handler.HAPPY_EYEBALLS_DELAY", 0.01)
+
+        async def open_connection(ip, port):
+            if ip == "192.0.2.1":
+                await asyncio.sleep(10)  # Never answers within the test
+            return mock_reader, mock_writer
+
+        mock_open = AsyncMock(side_effect=open_connection)
+        with patch("wormhole.handler.asyncio.open_connection", new=mock_open):
+            reader, writer = await _create_fastest_connection(
+                ip_list, 80, context, timeout=5, max_attempts=1
+            )
+
+        assert (reader, writer) == (mock_reader, mock_writer)
+        assert [c.args[0] for c in mock_open.call_args_list] == ip_list
+
+    async def test_create_fastest_connection_interleaves_families(
+        self, context, mock_rw, done, monkeypatch
+    ):
+        """Test that stalled IPv6 addresses only hold IPv4 back one step."""
+        stalled_ipv6s = ["2001:db8::1", "2001:db8::2"]
+        mock_reader, mock_writer = mock_rw
+        mock_writer.get_extra_info.return_value = ("93.184.216.34", 80)
+        monkeypatch.setattr("wormhole.handler.HAPPY_EYEBALLS_DELAY", 0.01)
+
+        with (
+            patch.dict("wormhole.handler.DNS_CACHE._data", {}, clear=True),
+            patch.multiple(
+                "wormhole.handler",
+                is_private_ip=Mock(return_value=False),
+                has_public_ipv6=Mock(return_value=True),
+            ),
+            patch("wormhole.handler.resolver") as mock_resolver,
+        ):
+            mock_resolver.resolve_with_ttl = lambda _host: done(
+                (stalled_ipv6s + ["93.184.216.34"], 300)
+            )
+            ip_list = await _resolve_and_validate_host(
+                "example.com", context, False
+            )
+
+        async def open_connection(ip, port):
+            if ip in stalled_ipv6s:
+                await asyncio.sleep(10)  # Never answers within the test
+            return mock_reader, mock_writer
+
+        mock_open = AsyncMock(side_effect=open_connection)
+        with patch("wormhole.handler.asyncio.open_connection", new=mock_open):
+            reader, writer = await _create_fastest_connection(
+                ip_list, 80, context, timeout=5, max_attempts=1
+            )
+
+        assert (reader, writer) == (mock_reader, mock_writer)
+        attempted = [c.args[0] for c in mock_open.call_args_list]
+        assert attempted[0] in stalled_ipv6s
+        assert attempted[1] == "93.184.216.34"
+
+    async def test_create_fastest_connection_fast_first_ip(
+        self, context, mock_rw
+    ):
+        """Test that later IPs are not tried when the first one connects."""
+        ip_list = ["93.184.216.34", "2606:2800:220:1:248:1893:25c8:1946"]
+        mock_reader, mock_writer = mock_rw
+        mock_writer.get_extra_info.return_value = ("93.184.216.34", 80)
+
+        mock_open = AsyncMock(return_value=(mock_reader, mock_writer))
+        with patch("wormhole.handler.asyncio.open_connection", new=mock_open):
+            await _create_fastest_connection(
+                ip_list, 80, context, timeout=5, max_attempts=1
+            )
+
+        mock_open.assert_awaited_once_with("93.184.216.34", 80)
@@ -6,7 +6,13 @@ import pytest
 import asyncio
 from unittest.mock import AsyncMock, Mock, patch
 from wormhole.context import RequestContext
-from wormhole.handler import _resolve_and_validate_host, DNS_CACHE
+from wormhole.handler import (
+    _resolve_and_validate_host,
+    _DnsCache,
+    DNS_CACHE,
+    DNS_MIN_TTL,
+    DNS_MAX_TTL,
+)
 from wormhole.safeguards import is_ad_domain, is_private_ip
 from wormhole.resolver import resolver
 
@@ -28,14 +34,15 @@ class TestDnsTtlCaching:
         # Mock the is_ad_domain function to return False
         with patch("wormhole.handler.is_ad_domain", return_value=False):
             # Mock the DNS cache to have a valid entry with TTL-based expiration
-            with patch(
-                "wormhole.handler.DNS_CACHE",
+            with patch.dict(
+                "wormhole.handler.DNS_CACHE._data",
                 {
-                    "example.com": (["93.184.216.34"], 0, 200)
-                },  # (ip_list, timestamp, ttl_expiration)
+                    "example.com": (["93.184.216.34"], 200)
+                },  # (ip_list, ttl_expiration)
+                clear=True,
             ):
                 # Mock time to make the cache valid (current time 100 < expiration time 200)
-                with patch("wormhole.handler.time.time", return_value=100):
+                with patch("wormhole.handler.time.monotonic", return_value=100):
                     result = await _resolve_and_validate_host(
                         host, context, False
                     )
@@ -52,11 +59,12 @@ class TestDnsTtlCaching:
         with patch("wormhole.handler.is_ad_domain", return_value=False):
             # Mock the DNS cache to have an expired entry (current time 300 > expiration time 200)
             with patch.dict(
-                "wormhole.handler.DNS_CACHE",
-                {"example.com": (["93.184.216.34"], 0, 200)},
+                "wormhole.handler.DNS_CACHE._data",
+                {"example.com": (["93.184.216.34"], 200)},
+                clear=True,
             ):
                 # Mock time to make the cache expired
-                with patch("wormhole.handler.time.time", return_value=300):
+                with patch("wormhole.handler.time.monotonic", return_value=300):
                     # Mock the resolver to return a valid IP and TTL
                     with patch("wormhole.handler.resolver") as mock_resolver:
                         mock_resolver.resolve_with_ttl = AsyncMock(
@@ -84,12 +92,12 @@ class TestDnsTtlCaching:
 
                                 # Verify that the cache was updated with the new entry and its TTL
                                 assert "example.com" in DNS_CACHE
-                                cached_ips, _, ttl_expiration = DNS_CACHE[
+                                cached_ips, ttl_expiration = DNS_CACHE[
                                     "example.com"
                                 ]
                                 assert cached_ips == ["93.184.216.35"]
-                                # Should be set to expire in 300 seconds from now (time.time() + 300)
-                                # Since we mocked time.time() to return 300, expiration should be 600
+                                # Should be set to expire in 300 seconds from now (time.monotonic() + 300)
+                                # Since we mocked time.monotonic() to return 300, expiration should be 600
                                 assert ttl_expiration == 600
 
     @pytest.mark.asyncio
@@ -120,9 +128,9 @@ class TestDnsTtlCaching:
                         "wormhole.handler.has_public_ipv6",
                         return_value=False,
                     ):
-                        # Mock time.time() to return a fixed value for consistent testing
+                        # Mock time.monotonic() to return a fixed value for consistent testing
                         with patch(
-                            "wormhole.handler.time.time", return_value=1000
+                            "wormhole.handler.time.monotonic", return_value=1000
                         ):
                             result = await _resolve_and_validate_host(
                                 host, context, False
@@ -134,9 +142,69 @@ class TestDnsTtlCaching:
 
                             # Verify that the cache was updated with the minimum TTL
                             assert "example.com" in DNS_CACHE
-                            cached_ips, _, ttl_expiration = DNS_CACHE[
+                            cached_ips, ttl_expiration = DNS_CACHE[
                                 "example.com"
                             ]
                             assert len(cached_ips) == 2
                             # Expiration should be 150 seconds from our mocked time (1000 + 150 = 1150)
                             assert ttl_expiration == 1150
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "record_ttl,cached_ttl",
+        [(0, DNS_MIN_TTL), (86400, DNS_MAX_TTL)],
+        ids=["below_floor", "above_ceiling"],
+    )
+    async def test_dns_cache_clamps_ttl(self, context, record_ttl, cached_ttl):
+        """Test that record TTLs are clamped to [DNS_MIN_TTL, DNS_MAX_TTL]."""
+        DNS_CACHE.clear()
+
+        with (
+            patch("wormhole.handler.is_ad_domain", return_value=False),
+            patch("wormhole.handler.resolver") as mock_resolver,
+            patch("wormhole.handler.is_private_ip", return_value=False),
+            patch("wormhole.handler.has_public_ipv6", return_value=False),
+            patch("wormhole.handler.time.monotonic", return_value=1000),
+        ):
+            mock_resolver.resolve_with_ttl = AsyncMock(
+                return_value=(["93.184.216.34"], record_ttl)
+            )
+            await _resolve_and_validate_host("example.com", context, False)
+
+        _, ttl_expiration = DNS_CACHE["example.com"]
+        assert ttl_expiration == 1000 + cached_ttl
+        DNS_CACHE.clear()
+
+    def test_dns_cache_evicts_least_recently_used(self):
+        """Test that the DNS cache stays within max_size using LRU order."""
+        cache = _DnsCache(max_size=2)
+        with patch("wormhole.handler.time.monotonic", return_value=1000):
+            cache.set("a.com", ["1.1.1.1"], 300)
+            cache.set("b.com", ["2.2.2.2"], 300)
+            # Touch a.com so b.com becomes the least recently used entry
+            assert cache.get("a.com") == ["1.1.1.1"]
+            cache.set("c.com", ["3.3.3.3"], 300)
+
+        assert len(cache) == 2
+        assert "a.com" in cache
+        assert "b.com" not in cache
+        assert "c.com" in cache
+
+    def test_dns_cache_drops_expired_entries(self):
+        """Test that expired entries are dropped on lookup and on insert."""
+        cache = _DnsCache()
+        with patch("wormhole.handler.time.monotonic", return_value=1000):
+            cache.set("short.com", ["1.1.1.1"], 10)
+            cache.set("stale.com", ["2.2.2.2"], 10)
+            cache.set("long.com", ["3.3.3.3"], 300)
+
+        with patch("wormhole.handler.time.monotonic", return_value=1100):
+            # Lookup of an expired host misses and removes it
+            assert cache.get("short.com") is None
+            assert "short.com" not in cache
+            # Inserting another host sweeps the remaining expired entry
+            cache.set("new.com", ["4.4.4.4"], 300)
+
+        assert "stale.com" not in cache
+        assert "long.com" in cache
+        assert len(cache) == 2
@@ -4,7 +4,7 @@ Unit tests for the handler module.
 """
 import pytest
 import asyncio
-from unittest.mock import AsyncMock, Mock, patch
+from unittest.mock import AsyncMock, patch
 from wormhole.context import RequestContext
 from wormhole.handler import (
     relay_stream,
@@ -13,6 +13,7 @@ from wormhole.handler import (
     _send_http_request,
     process_http_request,
     parse_request,
+    RELAY_CHUNK_SIZE,
 )
 
 
@@ -20,22 +21,14 @@ class TestRelayStream:
     """Test cases for the relay_stream function."""
 
     @pytest.fixture
-    def mock_reader(self):
-        """Create a mock StreamReader."""
-        reader = AsyncMock(spec=asyncio.StreamReader)
-        return reader
+    def mock_reader(self, mock_rw):
+        """Use the shared mock StreamReader."""
+        return mock_rw[0]
 
     @pytest.fixture
-    def mock_writer(self):
-        """Create a mock StreamWriter."""
-        writer = Mock(spec=asyncio.StreamWriter)
-        writer.is_closing.return_value = False
-        writer.close = Mock()
-        writer.wait_closed = AsyncMock()
-        # Properly handle the writer methods
-        writer.write = Mock()
-        writer.drain = AsyncMock()
-        return writer
+    def mock_writer(self, mock_rw):
+        """Use the shared mock StreamWriter."""
+        return mock_rw[1]
 
     @pytest.fixture
     def context(self):
@@ -128,6 +121,19 @@ class TestRelayStream:
         mock_writer.wait_closed.assert_not_called()
         assert result is None
 
+    @pytest.mark.asyncio
+    async def test_relay_stream_read_size(
+        self, mock_reader, mock_writer, context
+    ):
+        """Test relay_stream reads in RELAY_CHUNK_SIZE chunks."""
+        mock_reader.at_eof.side_effect = [False, False, True]
+        mock_reader.read.side_effect = [b"a" * RELAY_CHUNK_SIZE, b""]
+
+        await relay_stream(mock_reader, mock_writer, context)
+
+        mock_reader.read.assert_called_with(RELAY_CHUNK_SIZE)
+        mock_writer.write.assert_called_once_with(b"a" * RELAY_CHUNK_SIZE)
+
 
 class TestCreateFastestConnection:
     """Test cases for the _create_fastest_connection function."""
@@ -289,7 +295,10 @@ class TestSendHttpRequest:
             assert writer == mock_writer
 
             # Verify that the request was written to the writer
-            mock_writer.write.assert_called()
+            mock_writer.writelines.assert_called_once_with(
+                (b"GET / HTTP/1.1\r\nHost: example.com\r\n\r\n", b"")
+            )
+            mock_writer.write.assert_not_called()
             mock_writer.drain.assert_called()
 
 
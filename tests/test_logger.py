@@ -3,16 +3,41 @@
 Unit tests for the logger module.
 """
 import pytest
-import asyncio
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import DEFAULT, Mock, patch, MagicMock
 from wormhole.logger import LogThrottler, setup_logger, format_log_message
 
 
+@pytest.fixture(scope="class")
+def patched_logger_module():
+    """
+    Replace the loguru logger and the logging module in wormhole.logger.
+
+    Installed once per test class that requests it. Patching the whole
+    logger also keeps setup_logger from swapping LogThrottlers into the
+    real loguru logger used by the rest of the suite.
+
+    Yields:
+        dict[str, MagicMock]: The "logger" and "logging" mocks.
+    """
+    with patch.multiple(
+        "wormhole.logger", logger=DEFAULT, logging=DEFAULT
+    ) as mocks:
+        yield mocks
+
+
 class TestLogThrottler:
     """Test cases for the LogThrottler class."""
 
-    @pytest.mark.asyncio
-    async def test_log_throttler_new_message(self):
+    @pytest.fixture
+    def fake_loop(self):
+        """Patch the running loop so throttler timers can be fired directly."""
+        loop = Mock()
+        with patch(
+            "wormhole.logger.asyncio.get_running_loop", return_value=loop
+        ):
+            yield loop
+
+    def test_log_throttler_new_message(self):
         """Test that a new message is logged immediately."""
         mock_logger = Mock()
         throttler = LogThrottler(mock_logger, "info")
@@ -23,8 +48,7 @@ class TestLogThrottler:
         # Verify the message was logged
         mock_logger.opt().log.assert_called_once_with("INFO", "Test message")
 
-    @pytest.mark.asyncio
-    async def test_log_throttler_repeated_message(self):
+    def test_log_throttler_repeated_message(self, fake_loop):
         """Test that repeated messages are throttled."""
         mock_logger = Mock()
         throttler = LogThrottler(
@@ -40,14 +64,16 @@ class TestLogThrottler:
             "INFO", "Repeated message"
         )
 
-        # Wait for the delay to expire
-        await asyncio.sleep(0.15)
+        # Fire the pending timer instead of waiting for the delay to expire
+        delay, flush = fake_loop.call_later.call_args.args
+        assert delay == 0.1
+        flush()
 
-        # Second call should have been counted as a repeat
-        # The summary should be logged when the timer expires
+        # A single repeat is logged again as-is when the timer expires
+        assert mock_logger.opt().log.call_count == 2
+        mock_logger.opt().log.assert_called_with("INFO", "Repeated message")
 
-    @pytest.mark.asyncio
-    async def test_log_throttler_different_messages(self):
+    def test_log_throttler_different_messages(self):
         """Test that different messages are all logged."""
         mock_logger = Mock()
         throttler = LogThrottler(mock_logger, "info", delay=0.1)
@@ -61,8 +87,7 @@ class TestLogThrottler:
         mock_logger.opt().log.assert_any_call("INFO", "First message")
         mock_logger.opt().log.assert_any_call("INFO", "Second message")
 
-    @pytest.mark.asyncio
-    async def test_log_throttler_summary_multiple_repeats(self):
+    def test_log_throttler_summary_multiple_repeats(self, fake_loop):
         """Test that repeated messages show a summary."""
         mock_logger = Mock()
         throttler = LogThrottler(mock_logger, "info", delay=0.1)
@@ -72,65 +97,77 @@ class TestLogThrottler:
         throttler.process("Repeated message")
         throttler.process("Repeated message")
 
-        # Wait for the delay to expire
-        await asyncio.sleep(0.15)
+        # Fire the pending timer instead of waiting for the delay to expire
+        _, flush = fake_loop.call_later.call_args.args
+        flush()
 
         # The summary should be logged
+        mock_logger.opt().log.assert_called_with(
+            "INFO",
+            "Repeated message (and 2 more in the last 0.1 seconds.)",
+        )
 
 
 class TestSetupLogger:
     """Test cases for the setup_logger function."""
 
-    def test_setup_logger_basic(self):
-        """Test basic logger setup."""
-        with (
-            patch("wormhole.logger.logger.remove"),
-            patch("wormhole.logger.logger.add"),
-            patch("wormhole.logger.logging.getLogger"),
-        ):
-            setup_logger()
-
-    def test_setup_logger_verbose(self):
-        """Test logger setup with verbose mode."""
-        with (
-            patch("wormhole.logger.logger.remove"),
-            patch("wormhole.logger.logger.add"),
-            patch("wormhole.logger.logging.getLogger"),
-        ):
-            setup_logger(verbose=1)
-
-    def test_setup_logger_very_verbose(self):
-        """Test logger setup with very verbose mode."""
-        with (
-            patch("wormhole.logger.logger.remove"),
-            patch("wormhole.logger.logger.add"),
-            patch("wormhole.logger.logging.getLogger"),
-        ):
-            setup_logger(verbose=2)
+    @pytest.fixture(autouse=True)
+    def _reset_mocks(self, patched_logger_module):
+        """Clear calls recorded by the previous test."""
+        for mock in patched_logger_module.values():
+            mock.reset_mock()
+
+    @pytest.mark.parametrize(
+        "verbose,level,asyncio_level",
+        [
+            (0, "INFO", "CRITICAL"),
+            (1, "DEBUG", "CRITICAL"),
+            (2, "DEBUG", "DEBUG"),
+        ],
+        ids=["basic", "verbose", "very_verbose"],
+    )
+    def test_setup_logger_verbosity(
+        self, patched_logger_module, verbose, level, asyncio_level
+    ):
+        """Test the console and asyncio log levels for each verbosity."""
+        setup_logger(verbose=verbose)
+
+        mock_logger = patched_logger_module["logger"]
+        mock_logger.remove.assert_called_once_with()
+        mock_logger.add.assert_called_once()
+        assert mock_logger.add.call_args.kwargs["level"] == level
+
+        mock_logging = patched_logger_module["logging"]
+        mock_logging.getLogger.assert_called_once_with("asyncio")
+        mock_logging.getLogger().setLevel.assert_called_once_with(
+            getattr(mock_logging, asyncio_level)
+        )
 
-    def test_setup_logger_syslog(self):
+    def test_setup_logger_syslog(self, patched_logger_module):
         """Test logger setup with syslog."""
-        with (
-            patch("wormhole.logger.logger.remove"),
-            patch("wormhole.logger.logger.add"),
-            patch("wormhole.logger.logging.getLogger"),
-            patch("wormhole.logger.logging.handlers.SysLogHandler"),
-            patch("wormhole.logger.os.path.exists", return_value=True),
-        ):
+        with patch("wormhole.logger.os.path.exists", return_value=True):
             setup_logger(syslog_host="/dev/log")
 
-    def test_setup_logger_syslog_network(self):
+        mock_logging = patched_logger_module["logging"]
+        mock_logging.handlers.SysLogHandler.assert_called_once_with(
+            address="/dev/log"
+        )
+        assert patched_logger_module["logger"].add.call_count == 2
+
+    def test_setup_logger_syslog_network(self, patched_logger_module):
         """Test logger setup with network syslog."""
-        with (
-            patch("wormhole.logger.logger.remove"),
-            patch("wormhole.logger.logger.add"),
-            patch("wormhole.logger.logging.getLogger"),
-            patch("wormhole.logger.logging.handlers.SysLogHandler"),
-            patch("wormhole.logger.os.uname") as mock_uname,
-        ):
+        with patch("wormhole.logger.os.uname") as mock_uname:
             mock_uname.return_value.nodename = "testhost"
             setup_logger(syslog_host="syslog.example.com")
 
+        mock_logging = patched_logger_module["logging"]
+        mock_logging.handlers.SysLogHandler.assert_called_once_with(
+            address=("syslog.example.com", 514)
+        )
+        patched_logger_module["logger"].configure.assert_called_once_with(
+            extra={"hostname": "testhost"}
+        )
+
 
 class TestFormatLogMessage:
     """Test cases for the format_log_message function."""
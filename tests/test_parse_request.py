@@ -4,82 +4,104 @@ Unit tests for the parse_request function.
 """
 import pytest
 import asyncio
-from unittest.mock import AsyncMock, Mock, patch
+from unittest.mock import Mock, patch
 from wormhole.context import RequestContext
 from wormhole.handler import parse_request
 
 
-class TestParseRequest:
-    """Test cases for the parse_request function."""
-
-    @pytest.fixture
-    def context(self):
-        """Create a test RequestContext."""
-        ident = {"id": "test123", "client": "127.0.0.1"}
-        return RequestContext(ident, verbose=1)
+@pytest.fixture(scope="module")
+def context():
+    """
+    Create a RequestContext shared by the module.
 
-    @pytest.fixture
-    def mock_reader(self):
-        """Create a mock StreamReader."""
-        reader = AsyncMock(spec=asyncio.StreamReader)
-        return reader
+    parse_request only reads the context, so one instance is enough.
+    """
+    ident = {"id": "test123", "client": "127.0.0.1"}
+    return RequestContext(ident, verbose=1)
 
-    @pytest.mark.asyncio
-    async def test_parse_request_success(self, mock_reader, context):
-        """Test successful parsing of a request."""
-        # Mock the reader to return a valid HTTP request
-        request_data = b"GET / HTTP/1.1\r\nHost: example.com\r\n\r\n"
-        mock_reader.readuntil = AsyncMock(return_value=request_data)
 
-        result = await parse_request(mock_reader, context)
-
-        # Should return the request line, headers, and empty payload
-        request_line, headers, payload = result
-        assert request_line == "GET / HTTP/1.1"
-        assert headers == ["Host: example.com"]
-        assert payload == b""
+class TestParseRequest:
+    """Test cases for the parse_request function."""
 
-    @pytest.mark.asyncio
-    async def test_parse_request_with_content_length(
-        self, mock_reader, context
+    @pytest.fixture
+    def mock_reader(self, mock_rw):
+        """Use the shared mock StreamReader."""
+        return mock_rw[0]
+
+    @pytest.mark.parametrize(
+        "request_line,expected_headers,expected_payload",
+        [
+            ("GET / HTTP/1.1", ["Host: example.com"], b""),
+            (
+                "GET / HTTP/1.1",
+                ["Host: example.com", "Content-Length: 0"],
+                b"",
+            ),
+            (
+                "POST /test HTTP/1.1",
+                ["Host: example.com", "Content-Length: 4"],
+                b"test",
+            ),
+        ],
+        ids=["no_content_length", "zero_content_length", "with_payload"],
+    )
+    async def test_parse_request_success(
+        self,
+        mock_reader,
+        context,
+        request_line,
+        expected_headers,
+        expected_payload,
     ):
-        """Test parsing of a request with Content-Length header."""
-        # Mock the reader to return a valid HTTP request with payload
-        headers_data = b"POST /test HTTP/1.1\r\nHost: example.com\r\nContent-Length: 4\r\n\r\n"
-        payload_data = b"test"
-        mock_reader.readuntil = AsyncMock(return_value=headers_data)
-        mock_reader.readexactly = AsyncMock(return_value=payload_data)
+        """Test successful parsing of a request with and without a payload."""
+        # Mock the reader to return a valid HTTP request
+        mock_reader.readuntil.return_value = "\r\n".join(
+            [request_line, *expected_headers, "", ""]
+        ).encode()
+        mock_reader.readexactly.return_value = expected_payload
 
         result = await parse_request(mock_reader, context)
 
         # Should return the request line, headers, and payload
-        request_line, headers, payload = result
-        assert request_line == "POST /test HTTP/1.1"
-        assert headers == ["Host: example.com", "Content-Length: 4"]
-        assert payload == b"test"
-
-    @pytest.mark.asyncio
-    async def test_parse_request_timeout(self, mock_reader, context):
-        """Test parsing of a request that times out."""
-        # Mock the reader to raise a timeout error
-        mock_reader.readuntil = AsyncMock(
-            side_effect=asyncio.TimeoutError("Timeout")
-        )
-
-        result = await parse_request(mock_reader, context)
-
-        # Should return None for all values
-        assert result == (None, None, None)
-
-    @pytest.mark.asyncio
-    async def test_parse_request_incomplete_read(self, mock_reader, context):
-        """Test parsing of a request with incomplete payload."""
-        # Mock the reader to return headers but raise an incomplete read error for payload
-        headers_data = b"POST /test HTTP/1.1\r\nHost: example.com\r\nContent-Length: 10\r\n\r\n"
-        mock_reader.readuntil = AsyncMock(return_value=headers_data)
-        mock_reader.readexactly = AsyncMock(
-            side_effect=asyncio.IncompleteReadError(b"test", 10)
+        assert result == (request_line, expected_headers, expected_payload)
+        if expected_payload:
+            mock_reader.readexactly.assert_awaited_once_with(
+                len(expected_payload)
+            )
+        else:
+            # Nothing to read after the headers, so no payload read is awaited
+            mock_reader.readexactly.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "which_mock,exc",
+        [
+            ("readuntil", asyncio.TimeoutError("Timeout")),
+            (
+                "readuntil",
+                asyncio.LimitOverrunError("Separator is not found", 262144),
+            ),
+            ("readuntil", ConnectionResetError("Connection reset by peer")),
+            ("readexactly", asyncio.IncompleteReadError(b"test", 10)),
+            ("readexactly", ConnectionResetError("Connection reset by peer")),
+        ],
+        ids=[
+            "timeout",
+            "headers_too_large",
+            "connection_reset",
+            "incomplete_payload",
+            "payload_connection_reset",
+        ],
+    )
+    async def test_parse_request_read_failure(
+        self, mock_reader, context, which_mock, exc
+    ):
+        """Test parsing of a request whose headers or payload cannot be read."""
+        # The headers announce a payload; the failing read raises instead
+        mock_reader.readuntil.return_value = (
+            b"POST /test HTTP/1.1\r\nHost: example.com\r\n"
+            b"Content-Length: 10\r\n\r\n"
         )
+        getattr(mock_reader, which_mock).side_effect = exc
 
         result = await parse_request(mock_reader, context)
 
@@ -3,8 +3,7 @@
 Additional unit tests for the process_https_tunnel function error conditions.
 """
 import pytest
-import asyncio
-from unittest.mock import AsyncMock, Mock, patch
+from unittest.mock import AsyncMock, patch
 from wormhole.context import RequestContext
 from wormhole.handler import process_https_tunnel
 
@@ -13,25 +12,19 @@ class TestProcessHttpsTunnelErrors:
     """Additional test cases for error conditions in process_https_tunnel function."""
 
     @pytest.fixture
-    def mock_reader(self):
-        """Create a mock StreamReader."""
-        reader = AsyncMock(spec=asyncio.StreamReader)
-        return reader
+    def mock_reader(self, mock_rw):
+        """Use the shared mock StreamReader."""
+        return mock_rw[0]
 
     @pytest.fixture
-    def mock_writer(self):
-        """Create a mock StreamWriter."""
-        writer = Mock(spec=asyncio.StreamWriter)
-        writer.is_closing.return_value = False
-        writer.close = Mock()
-        writer.wait_closed = AsyncMock()
-        writer.write = Mock()
+    def mock_writer(self, mock_rw):
+        """Use the shared mock StreamWriter with an awaitable drain()."""
+        writer = mock_rw[1]
         writer.drain = AsyncMock()
         return writer
 
-    @pytest.mark.asyncio
     async def test_process_https_tunnel_ad_domain_blocked(
-        self, mock_reader, mock_writer
+        self, mock_reader, mock_writer, assert_wrote
     ):
         """Test when the target domain is blocked by ad-blocker."""
         method = "CONNECT"
@@ -54,7 +47,5 @@ class TestProcessHttpsTunnelErrors:
             )
 
             # Should send a 403 Forbidden response
-            mock_writer.write.assert_called_with(
-                b"HTTP/1.1 403 Forbidden\r\n\r\n"
-            )
-            mock_writer.drain.assert_awaited()
+            assert_wrote(mock_writer, b"HTTP/1.1 403 Forbidden\r\n\r\n")
+            mock_writer.drain.assert_awaited_once()
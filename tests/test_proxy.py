@@ -3,171 +3,145 @@
 Unit tests for the proxy module.
 """
 import pytest
+import copy
 import sys
 import asyncio
-from unittest.mock import Mock, patch, AsyncMock, MagicMock
+from unittest.mock import (
+    DEFAULT,
+    Mock,
+    patch,
+    AsyncMock,
+    MagicMock,
+    call,
+    create_autospec,
+)
 from argparse import Namespace
-from wormhole.proxy import main, main_async
+from types import ModuleType
+from wormhole.proxy import main, main_async, _run_workers
+from wormhole.resolver import resolver
+from wormhole.server import start_wormhole_server
+
+# Autospecced stand-ins built once and reset by TestMainAsync.proxy_patched.
+RESOLVER_MOCK = create_autospec(resolver, instance=True)
+START_SERVER_MOCK = create_autospec(start_wormhole_server)
+
+# wormhole.proxy attributes replaced in every main_async test.
+COMMON_PATCHES = dict(
+    # main_async only reads the loop module's name
+    uvloop=ModuleType("uvloop"),
+    logger=DEFAULT,
+    resolver=RESOLVER_MOCK,
+    load_allowlist=DEFAULT,
+    load_ad_block_db=DEFAULT,
+    start_wormhole_server=START_SERVER_MOCK,
+)
+
+# Parsed command line with every option at its default. Tests override
+# only the options they exercise through make_args().
+DEFAULT_ARGS = Namespace(
+    host="127.0.0.1",
+    port=8080,
+    allow_private=False,
+    syslog_host=None,
+    syslog_port=514,
+    license=False,
+    workers=1,
+    verbose=0,
+    auth=None,
+    auth_add=None,
+    auth_mod=None,
+    auth_del=None,
+    ad_block_db=None,
+    update_ad_block_db=None,
+    allowlist=None,
+)
+
+
+def make_args(**overrides) -> Namespace:
+    """
+    Copy DEFAULT_ARGS with some options overridden.
+
+    Args:
+        **overrides: Option names and the values to give them.
+
+    Returns:
+        Namespace: The new argument namespace.
+    """
+    args = copy.copy(DEFAULT_ARGS)
+    args.__dict__.update(overrides)
+    return args
 
 
 class TestMainAsync:
     """Test cases for the main_async function."""
 
-    @pytest.mark.asyncio
-    async def test_main_async_basic(self):
-        """Test main_async with basic parameters."""
-        # Create a mock args namespace
-        args = Namespace(
-            host="127.0.0.1",
-            port=8080,
-            allowlist=None,
-            ad_block_db=None,
-            auth=None,
-            verbose=0,
-            allow_private=False,
-            syslog_host=None,
-            syslog_port=514,
-        )
+    @pytest.fixture
+    def proxy_patched(self):
+        """
+        Patch every wormhole.proxy dependency of main_async for one test.
+
+        The shutdown event is a real asyncio.Event that is already set, so
+        main_async shuts down as soon as the server has started.
+        get_running_loop is patched too, so no signal handlers are installed
+        on the test loop.
+
+        Yields:
+            dict[str, Mock]: The patched attributes by name, plus "server",
+            the mock server that start_wormhole_server returns.
+        """
+        RESOLVER_MOCK.reset_mock()
+        START_SERVER_MOCK.reset_mock()
+        server = START_SERVER_MOCK.return_value = Mock(wait_closed=AsyncMock())
+        event = asyncio.Event()
+        event.set()
 
-        # Mock all the dependencies
         with (
-            patch("wormhole.proxy.uvloop") as mock_uvloop,
-            patch("wormhole.proxy.logger") as mock_logger,
-            patch("wormhole.proxy.resolver") as mock_resolver,
-            patch("wormhole.proxy.load_allowlist") as mock_load_allowlist,
-            patch("wormhole.proxy.load_ad_block_db") as mock_load_ad_block_db,
-            patch("wormhole.proxy.start_wormhole_server") as mock_start_server,
-            patch("wormhole.proxy.asyncio.Event") as mock_event,
-            patch("wormhole.proxy.asyncio.get_running_loop") as mock_get_loop,
+            patch.multiple("wormhole.proxy", **COMMON_PATCHES) as mocks,
+            patch("wormhole.proxy.asyncio.get_running_loop"),
+            patch("wormhole.proxy.asyncio.Event", new=lambda: event),
         ):
-
-            # Set up mocks
-            mock_server = AsyncMock()
-            mock_start_server.return_value = mock_server
-
-            mock_shutdown_event = Mock()
-            mock_event.return_value = mock_shutdown_event
-            mock_shutdown_event.wait = AsyncMock()
-
-            mock_loop = Mock()
-            mock_get_loop.return_value = mock_loop
-
-            # Mock uvloop.__name__ attribute
-            mock_uvloop.__name__ = "uvloop"
-
-            # Call the function
-            await main_async(args)
-
-            # Verify the calls
-            mock_resolver.initialize.assert_called_once_with(verbose=0)
-            mock_start_server.assert_called_once_with(
-                "127.0.0.1", 8080, None, 0, False
-            )
-            mock_shutdown_event.wait.assert_awaited_once()
-            mock_server.close.assert_called_once()
-            mock_server.wait_closed.assert_awaited_once()
-
-    @pytest.mark.asyncio
-    async def test_main_async_with_allowlist(self):
-        """Test main_async with allowlist."""
-        # Create a mock args namespace
-        args = Namespace(
-            host="127.0.0.1",
-            port=8080,
-            allowlist="/path/to/allowlist",
-            ad_block_db=None,
-            auth=None,
-            verbose=0,
-            allow_private=False,
-            syslog_host=None,
-            syslog_port=514,
+            yield {
+                **mocks,
+                "resolver": RESOLVER_MOCK,
+                "start_wormhole_server": START_SERVER_MOCK,
+                "server": server,
+            }
+
+    @pytest.mark.parametrize(
+        "allowlist,ad_block_db,expected_loader",
+        [
+            (None, None, None),
+            ("/path/to/allowlist", None, "load_allowlist"),
+            (None, "/path/to/adblock.db", "load_ad_block_db"),
+        ],
+        ids=["basic", "with_allowlist", "with_ad_block_db"],
+    )
+    async def test_main_async(
+        self, proxy_patched, allowlist, ad_block_db, expected_loader
+    ):
+        """Test main_async with and without the optional domain lists."""
+        mocks = proxy_patched
+        mocks["load_allowlist"].return_value = 10
+        mocks["load_ad_block_db"].return_value = 100
+
+        await main_async(
+            make_args(allowlist=allowlist, ad_block_db=ad_block_db)
         )
 
-        # Mock all the dependencies
-        with (
-            patch("wormhole.proxy.uvloop") as mock_uvloop,
-            patch("wormhole.proxy.logger") as mock_logger,
-            patch("wormhole.proxy.resolver") as mock_resolver,
-            patch("wormhole.proxy.load_allowlist") as mock_load_allowlist,
-            patch("wormhole.proxy.load_ad_block_db") as mock_load_ad_block_db,
-            patch("wormhole.proxy.start_wormhole_server") as mock_start_server,
-            patch("wormhole.proxy.asyncio.Event") as mock_event,
-            patch("wormhole.proxy.asyncio.get_running_loop") as mock_get_loop,
-        ):
-
-            # Set up mocks
-            mock_load_allowlist.return_value = 10
-
-            mock_server = AsyncMock()
-            mock_start_server.return_value = mock_server
-
-            mock_shutdown_event = Mock()
-            mock_event.return_value = mock_shutdown_event
-            mock_shutdown_event.wait = AsyncMock()
-
-            mock_loop = Mock()
-            mock_get_loop.return_value = mock_loop
-
-            # Mock uvloop.__name__ attribute
-            mock_uvloop.__name__ = "uvloop"
-
-            # Call the function
-            await main_async(args)
-
-            # Verify the calls
-            mock_load_allowlist.assert_called_once()
-            mock_start_server.assert_called_once()
-
-    @pytest.mark.asyncio
-    async def test_main_async_with_ad_block_db(self):
-        """Test main_async with ad-block database."""
-        # Create a mock args namespace
-        args = Namespace(
-            host="127.0.0.1",
-            port=8080,
-            allowlist=None,
-            ad_block_db="/path/to/adblock.db",
-            auth=None,
-            verbose=0,
-            allow_private=False,
-            syslog_host=None,
-            syslog_port=514,
+        # Only the loader for the given list should run
+        for loader in ("load_allowlist", "load_ad_block_db"):
+            if loader == expected_loader:
+                mocks[loader].assert_called_once()
+            else:
+                mocks[loader].assert_not_called()
+
+        # Verify the calls
+        mocks["resolver"].initialize.assert_called_once_with(verbose=0)
+        mocks["start_wormhole_server"].assert_called_once_with(
+            "127.0.0.1", 8080, None, 0, False, reuse_port=False
         )
-
-        # Mock all the dependencies
-        with (
-            patch("wormhole.proxy.uvloop") as mock_uvloop,
-            patch("wormhole.proxy.logger") as mock_logger,
-            patch("wormhole.proxy.resolver") as mock_resolver,
-            patch("wormhole.proxy.load_allowlist") as mock_load_allowlist,
-            patch("wormhole.proxy.load_ad_block_db") as mock_load_ad_block_db,
-            patch("wormhole.proxy.start_wormhole_server") as mock_start_server,
-            patch("wormhole.proxy.asyncio.Event") as mock_event,
-            patch("wormhole.proxy.asyncio.get_running_loop") as mock_get_loop,
-        ):
-
-            # Set up mocks
-            mock_load_ad_block_db.return_value = 100
-
-            mock_server = AsyncMock()
-            mock_start_server.return_value = mock_server
-
-            mock_shutdown_event = Mock()
-            mock_event.return_value = mock_shutdown_event
-            mock_shutdown_event.wait = AsyncMock()
-
-            mock_loop = Mock()
-            mock_get_loop.return_value = mock_loop
-
-            # Mock uvloop.__name__ attribute
-            mock_uvloop.__name__ = "uvloop"
-
-            # Call the function
-            await main_async(args)
-
-            # Verify the calls
-            mock_load_ad_block_db.assert_called_once()
-            mock_start_server.assert_called_once()
+        mocks["server"].close.assert_called_once()
+        mocks["server"].wait_closed.assert_awaited_once()
 
 
 class TestMain:
@@ -184,13 +158,7 @@ class TestMain:
                 patch("builtins.print") as mock_print,
             ):
 
-                mock_args = Mock()
-                mock_args.license = True
-                mock_args.auth_add = None
-                mock_args.auth_mod = None
-                mock_args.auth_del = None
-                mock_args.update_ad_block_db = None
-                mock_parse.return_value = mock_args
+                mock_parse.return_value = make_args(license=True)
 
                 # Mock Path properly
                 mock_path_instance = MagicMock()
@@ -211,16 +179,9 @@ class TestMain:
                 patch("wormhole.proxy.add_user") as mock_add_user,
             ):
 
-                mock_args = Mock()
-                mock_args.license = False
-                mock_args.auth_add = ["/path/to/auth", "username"]
-                mock_args.auth_mod = None
-                mock_args.auth_del = None
-                mock_args.update_ad_block_db = None
-                mock_args.syslog_host = None
-                mock_args.syslog_port = 514
-                mock_args.verbose = 0
-                mock_parse.return_value = mock_args
+                mock_parse.return_value = make_args(
+                    auth_add=["/path/to/auth", "username"]
+                )
 
                 mock_add_user.return_value = 0
 
@@ -240,16 +201,9 @@ class TestMain:
                 patch("wormhole.proxy.modify_user") as mock_modify_user,
             ):
 
-                mock_args = Mock()
-                mock_args.license = False
-                mock_args.auth_add = None
-                mock_args.auth_mod = ["/path/to/auth", "username"]
-                mock_args.auth_del = None
-                mock_args.update_ad_block_db = None
-                mock_args.syslog_host = None
-                mock_args.syslog_port = 514
-                mock_args.verbose = 0
-                mock_parse.return_value = mock_args
+                mock_parse.return_value = make_args(
+                    auth_mod=["/path/to/auth", "username"]
+                )
 
                 mock_modify_user.return_value = 0
 
@@ -269,16 +223,9 @@ class TestMain:
                 patch("wormhole.proxy.delete_user") as mock_delete_user,
             ):
 
-                mock_args = Mock()
-                mock_args.license = False
-                mock_args.auth_add = None
-                mock_args.auth_mod = None
-                mock_args.auth_del = ["/path/to/auth", "username"]
-                mock_args.update_ad_block_db = None
-                mock_args.syslog_host = None
-                mock_args.syslog_port = 514
-                mock_args.verbose = 0
-                mock_parse.return_value = mock_args
+                mock_parse.return_value = make_args(
+                    auth_del=["/path/to/auth", "username"]
+                )
 
                 mock_delete_user.return_value = 0
 
@@ -300,20 +247,12 @@ class TestMain:
                 patch("wormhole.proxy.asyncio.run") as mock_asyncio_run,
             ):
 
-                mock_args = Mock()
-                mock_args.license = False
-                mock_args.auth_add = None
-                mock_args.auth_mod = None
-                mock_args.auth_del = None
-                mock_args.update_ad_block_db = "/path/to/adblock.db"
-                mock_args.allowlist = None
-                mock_args.syslog_host = None
-                mock_args.syslog_port = 514
-                mock_args.verbose = 0
-                mock_args.auth = None  # Add the auth attribute
-                mock_parse.return_value = mock_args
-
-                mock_asyncio_run.return_value = None
+                mock_parse.return_value = make_args(
+                    update_ad_block_db="/path/to/adblock.db"
+                )
+
+                # Close the coroutine instead of leaving it unawaited
+                mock_asyncio_run.side_effect = lambda coro: coro.close()
 
                 # Mock the event loop to avoid RuntimeError
                 with patch("asyncio.get_event_loop") as mock_get_loop:
@@ -343,25 +282,12 @@ class TestMain:
                 # Mock uvloop to not have the 'run' attribute, so it will use asyncio.run
                 del mock_uvloop.run
 
-                mock_args = Mock()
-                mock_args.license = False
-                mock_args.auth_add = None
-                mock_args.auth_mod = None
-                mock_args.auth_del = None
-                mock_args.update_ad_block_db = None
-                mock_args.host = "127.0.0.1"
-                mock_args.port = 8080
-                mock_args.syslog_host = None
-                mock_args.syslog_port = 514
-                mock_args.verbose = 0
-                mock_args.auth = None
-                mock_args.allowlist = None
-                mock_args.ad_block_db = None
-                mock_args.allow_private = False
-                mock_parse.return_value = mock_args
-
-                # Mock asyncio.run to avoid actually running the async function
-                mock_asyncio_run.return_value = None
+                mock_parse.return_value = make_args()
+
+                # Mock asyncio.run to avoid actually running the async
+                # function, closing the coroutine instead of leaving it
+                # unawaited
+                mock_asyncio_run.side_effect = lambda coro: coro.close()
 
                 # Mock the event loop to avoid RuntimeError
                 with patch("asyncio.get_event_loop") as mock_get_loop:
@@ -385,20 +311,97 @@ class TestMain:
                 "wormhole.proxy.ArgumentParser.parse_args"
             ) as mock_parse:
 
-                mock_args = Mock()
-                mock_args.license = False
-                mock_args.auth_add = None
-                mock_args.auth_mod = None
-                mock_args.auth_del = None
-                mock_args.update_ad_block_db = None
-                mock_args.port = 100  # Invalid port
-                mock_args.syslog_host = None
-                mock_args.syslog_port = 514
-                mock_args.verbose = 0
-                mock_args.auth = None  # Add the auth attribute
-                mock_parse.return_value = mock_args
-
-                # This should cause the parser to call sys.exit
-                with patch("sys.exit") as mock_exit:
+                mock_parse.return_value = make_args(port=100)
+
+                # The parser should reject the port and exit before the
+                # server is started
+                with pytest.raises(SystemExit) as exc_info:
                     main()
-                    mock_exit.assert_called_once()
+                assert exc_info.value.code == 2
+
+    def test_main_invalid_workers(self):
+        """Test main with fewer than one worker."""
+        test_args = ["wormhole", "--workers", "0"]
+
+        with patch.object(sys, "argv", test_args):
+            with patch(
+                "wormhole.proxy.ArgumentParser.parse_args"
+            ) as mock_parse:
+
+                mock_parse.return_value = make_args(workers=0)
+
+                with pytest.raises(SystemExit) as exc_info:
+                    main()
+                assert exc_info.value.code == 2
+
+    def test_main_workers_without_reuseport(self):
+        """Test main with several workers on a platform lacking SO_REUSEPORT."""
+        test_args = ["wormhole", "--workers", "2"]
+
+        with patch.object(sys, "argv", test_args):
+            with (
+                patch("wormhole.proxy.ArgumentParser.parse_args") as mock_parse,
+                # A socket module without the SO_REUSEPORT constant
+                patch("wormhole.proxy.socket", ModuleType("socket")),
+                patch("wormhole.proxy._run_workers") as mock_run_workers,
+            ):
+
+                mock_parse.return_value = make_args(workers=2)
+
+                with pytest.raises(SystemExit) as exc_info:
+                    main()
+                assert exc_info.value.code == 2
+                mock_run_workers.assert_not_called()
+
+
+class TestRunWorkers:
+    """Test cases for the _run_workers function."""
+
+    @pytest.mark.parametrize(
+        "statuses,expected",
+        [((0, 0), 0), ((0, 1 << 8), 1)],
+        ids=["all_clean", "one_failed"],
+    )
+    def test_run_workers_waits_for_every_worker(self, statuses, expected):
+        """Test that the parent forks each worker and reports failures."""
+        args = Namespace(workers=2)
+        pids = [101, 102]
+
+        with (
+            patch("wormhole.proxy.os.fork", side_effect=pids) as mock_fork,
+            patch(
+                "wormhole.proxy.os.waitpid",
+                side_effect=list(zip(pids, statuses)),
+            ) as mock_waitpid,
+            patch("wormhole.proxy.signal.signal"),
+        ):
+            assert _run_workers(args) == expected
+
+        assert mock_fork.call_count == 2
+        assert [c.args[0] for c in mock_waitpid.call_args_list] == pids
+
+    @pytest.mark.parametrize(
+        "run_server,expected",
+        [(Mock(return_value=0), 0), (Mock(side_effect=RuntimeError), 1)],
+        ids=["clean_exit", "crash"],
+    )
+    def test_run_workers_child_flushes_before_exit(self, run_server, expected):
+        """Test that a worker flushes stdio before leaving with os._exit."""
+        manager = Mock()
+        manager._exit.side_effect = SystemExit  # Stop instead of exiting
+
+        with (
+            patch("wormhole.proxy.os.fork", return_value=0),
+            patch("wormhole.proxy._run_server", new=run_server),
+            patch("wormhole.proxy.os._exit", new=manager._exit),
+            patch("wormhole.proxy.sys.stdout", new=manager.stdout),
+            patch("wormhole.proxy.sys.stderr", new=manager.stderr),
+        ):
+            with pytest.raises(SystemExit):
+                _run_workers(Namespace(workers=1))
+
+        assert manager.mock_calls == [
+            call.stdout.flush(),
+            call.stderr.flush(),
+            call._exit(expected),
+        ]
@@ -4,54 +4,57 @@ Unit tests for the _resolve_and_validate_host function.
 """
 import pytest
 import asyncio
-from unittest.mock import AsyncMock, Mock, patch
+import gc
+from unittest.mock import DEFAULT, AsyncMock, Mock, patch
 from wormhole.context import RequestContext
-from wormhole.handler import _resolve_and_validate_host
+from wormhole.handler import _resolve_and_validate_host, DNS_INFLIGHT
 from wormhole.safeguards import is_ad_domain, is_private_ip
 from wormhole.resolver import resolver
 
 
+@pytest.fixture(scope="module")
+def context():
+    """
+    Create a RequestContext shared by the module.
+
+    _resolve_and_validate_host only reads the context, so one instance is
+    enough.
+    """
+    ident = {"id": "test123", "client": "127.0.0.1"}
+    return RequestContext(ident, verbose=1)
+
+
 class TestResolveAndValidateHost:
     """Test cases for the _resolve_and_validate_host function."""
 
-    @pytest.fixture
-    def context(self):
-        """Create a test RequestContext."""
-        ident = {"id": "test123", "client": "127.0.0.1"}
-        return RequestContext(ident, verbose=1)
-
-    @pytest.mark.asyncio
-    async def test_resolve_and_validate_host_success(self, context):
+    async def test_resolve_and_validate_host_success(self, context, done):
         """Test successful resolution and validation of a host."""
         host = "example.com"
 
-        # Mock the is_ad_domain function to return False
-        with patch("wormhole.handler.is_ad_domain", return_value=False):
-            # Mock the resolver to return a valid IP and TTL
-            with patch("wormhole.handler.resolver") as mock_resolver:
-                mock_resolver.resolve_with_ttl = AsyncMock(
-                    return_value=(
-                        ["93.184.216.34"],
-                        300,
-                    )  # example.com with 300s TTL
-                )
+        with (
+            # Start from an empty cache whatever ran earlier in this process
+            patch.dict("wormhole.handler.DNS_CACHE._data", {}, clear=True),
+            patch.multiple(
+                "wormhole.handler",
+                is_ad_domain=DEFAULT,
+                is_private_ip=DEFAULT,
+                has_public_ipv6=DEFAULT,
+                resolver=DEFAULT,
+            ) as mocks,
+        ):
+            mocks["is_ad_domain"].return_value = False
+            mocks["is_private_ip"].return_value = False
+            mocks["has_public_ipv6"].return_value = False
+            # example.com with 300s TTL
+            mocks["resolver"].resolve_with_ttl = lambda _host: done(
+                (["93.184.216.34"], 300)
+            )
+
+            result = await _resolve_and_validate_host(host, context, False)
+
+        # Should return the IP list
+        assert result == ["93.184.216.34"]
 
-                # Mock is_private_ip to return False for the IP
-                with patch(
-                    "wormhole.handler.is_private_ip", return_value=False
-                ):
-                    # Mock has_public_ipv6 to return False
-                    with patch(
-                        "wormhole.handler.has_public_ipv6", return_value=False
-                    ):
-                        result = await _resolve_and_validate_host(
-                            host, context, False
-                        )
-
-                        # Should return the IP list
-                        assert result == ["93.184.216.34"]
-
-    @pytest.mark.asyncio
     async def test_resolve_and_validate_host_ad_domain_blocked(self, context):
         """Test that ad domains are blocked."""
         host = "ads.example.com"
@@ -62,3 +65,86 @@ class TestResolveAndValidateHost:
                 await _resolve_and_validate_host(host, context, False)
 
             assert "Blocked ad domain" in str(exc_info.value)
+
+    async def test_resolve_and_validate_host_coalesces_lookups(self, context):
+        """Test that concurrent cache misses for a host share one lookup."""
+        host = "example.com"
+
+        async def slow_resolve(_host):
+            await asyncio.sleep(0.01)
+            return ["93.184.216.34"], 300
+
+        with (
+            patch.dict("wormhole.handler.DNS_CACHE._data", {}, clear=True),
+            patch.multiple(
+                "wormhole.handler",
+                is_ad_domain=DEFAULT,
+                is_private_ip=DEFAULT,
+                has_public_ipv6=DEFAULT,
+                resolver=DEFAULT,
+            ) as mocks,
+        ):
+            mocks["is_ad_domain"].return_value = False
+            mocks["is_private_ip"].return_value = False
+            mocks["has_public_ipv6"].return_value = False
+            mock_resolve = mocks["resolver"].resolve_with_ttl = AsyncMock(
+                side_effect=slow_resolve
+            )
+
+            results = await asyncio.gather(
+                *(
+                    _resolve_and_validate_host(host, context, False)
+                    for _ in range(50)
+                )
+            )
+
+        # Only the first miss should reach the resolver
+        mock_resolve.assert_awaited_once_with(host)
+        assert results == [["93.184.216.34"]] * 50
+        assert host not in DNS_INFLIGHT
+
+    async def test_resolve_and_validate_host_cancelled_waiter_failed_lookup(
+        self, context
+    ):
+        """Test that a failed lookup nobody awaits any more is not reported."""
+        host = "example.com"
+        release = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        unhandled = []
+
+        async def failing_resolve(_host):
+            await release.wait()
+            raise OSError("DNS resolution failed")
+
+        previous_handler = loop.get_exception_handler()
+        loop.set_exception_handler(lambda _loop, ctx: unhandled.append(ctx))
+        try:
+            with (
+                patch.dict("wormhole.handler.DNS_CACHE._data", {}, clear=True),
+                patch.dict("wormhole.handler.DNS_INFLIGHT", {}, clear=True),
+                patch("wormhole.handler.is_ad_domain", return_value=False),
+                patch("wormhole.handler.resolver") as mock_resolver,
+            ):
+                mock_resolver.resolve_with_ttl = failing_resolve
+
+                # Cancel the only waiter while the lookup is still running
+                waiter = asyncio.create_task(
+                    _resolve_and_validate_host(host, context, False)
+                )
+                await asyncio.sleep(0)
+                lookup = DNS_INFLIGHT[host]
+                waiter.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await waiter
+
+                release.set()
+                await asyncio.wait([lookup])
+                assert host not in DNS_INFLIGHT
+
+            # Drop the last reference so an unretrieved exception is reported
+            del lookup, waiter
+            gc.collect()
+        finally:
+            loop.set_exception_handler(previous_handler)
+
+        assert unhandled == []
@@ -4,144 +4,166 @@ Additional unit tests for the _resolve_and_validate_host function error conditio
 """
 import pytest
 import asyncio
-from unittest.mock import AsyncMock, Mock, patch
+from unittest.mock import DEFAULT, AsyncMock, Mock, patch
 from wormhole.context import RequestContext
 from wormhole.handler import _resolve_and_validate_host
 from wormhole.safeguards import is_ad_domain, is_private_ip
 from wormhole.resolver import resolver
 
 
+@pytest.fixture(scope="module")
+def context():
+    """
+    Create a RequestContext shared by the module.
+
+    _resolve_and_validate_host only reads the context, so one instance is
+    enough.
+    """
+    ident = {"id": "test123", "client": "127.0.0.1"}
+    return RequestContext(ident, verbose=1)
+
+
+@pytest.fixture
+def handler_safeguards():
+    """
+    Patch the safeguard checks used by wormhole.handler to let hosts through.
+
+    The DNS cache and the in-flight lookups are swapped for empty ones too,
+    so entries resolved by one test never satisfy a lookup in another.
+
+    Tests override only the check they exercise, e.g.
+    `handler_safeguards["is_private_ip"].return_value = True`.
+
+    Yields:
+        dict[str, MagicMock]: The "is_ad_domain", "is_private_ip" and
+        "has_public_ipv6" mocks, all returning False.
+    """
+    with (
+        patch.dict("wormhole.handler.DNS_CACHE._data", {}, clear=True),
+        patch.dict("wormhole.handler.DNS_INFLIGHT", {}, clear=True),
+        patch.multiple(
+            "wormhole.handler",
+            is_ad_domain=DEFAULT,
+            is_private_ip=DEFAULT,
+            has_public_ipv6=DEFAULT,
+        ) as mocks,
+    ):
+        for mock in mocks.values():
+            mock.return_value = False
+        yield mocks
+
+
+@pytest.mark.usefixtures("handler_safeguards")
 class TestResolveAndValidateHostErrors:
     """Additional test cases for error conditions in _resolve_and_validate_host function."""
 
-    @pytest.fixture
-    def context(self):
-        """Create a test RequestContext."""
-        ident = {"id": "test123", "client": "127.0.0.1"}
-        return RequestContext(ident, verbose=1)
-
-    @pytest.mark.asyncio
     async def test_resolve_and_validate_host_dns_cache_hit(self, context):
         """Test DNS cache hit scenario."""
         host = "example.com"
 
-        # Mock the is_ad_domain function to return False
-        with patch("wormhole.handler.is_ad_domain", return_value=False):
-            # Mock the DNS cache to have a hit
-            with patch(
-                "wormhole.handler.DNS_CACHE",
-                {
-                    "example.com": (["93.184.216.34"], 0, 1000)
-                },  # (ip_list, timestamp, ttl_expiration)
-            ):
-                # Mock time to make the cache valid
-                with patch("wormhole.handler.time.time", return_value=100):
-                    result = await _resolve_and_validate_host(
-                        host, context, False
-                    )
-
-                    # Should return the cached IP list
-                    assert result == ["93.184.216.34"]
-
-    @pytest.mark.asyncio
-    async def test_resolve_and_validate_host_dns_cache_expired(self, context):
+        with (
+            # (ip_list, ttl_expiration)
+            patch.dict(
+                "wormhole.handler.DNS_CACHE._data",
+                {"example.com": (["93.184.216.34"], 1000)},
+                clear=True,
+            ),
+            # Make the cache entry valid
+            patch("wormhole.handler.time.monotonic", return_value=100),
+        ):
+            result = await _resolve_and_validate_host(host, context, False)
+
+        # Should return the cached IP list
+        assert result == ["93.184.216.34"]
+
+    async def test_resolve_and_validate_host_dns_cache_expired(
+        self, context, done
+    ):
         """Test DNS cache expired scenario."""
         host = "example.com"
 
-        # Mock the is_ad_domain function to return False
-        with patch("wormhole.handler.is_ad_domain", return_value=False):
-            # Mock the DNS cache to have an expired entry
-            with patch(
-                "wormhole.handler.DNS_CACHE",
-                {
-                    "example.com": (["93.184.216.34"], 0, 100)
-                },  # (ip_list, timestamp, ttl_expiration)
-            ):
-                # Mock time to make the cache expired
-                with patch("wormhole.handler.time.time", return_value=100000):
-                    # Mock the resolver to return a valid IP and TTL
-                    with patch("wormhole.handler.resolver") as mock_resolver:
-                        mock_resolver.resolve_with_ttl = AsyncMock(
-                            return_value=(
-                                ["93.184.216.34"],
-                                300,
-                            )  # IP with 300s TTL
-                        )
-
-                        # Mock is_private_ip to return False for the IP
-                        with patch(
-                            "wormhole.handler.is_private_ip", return_value=False
-                        ):
-                            # Mock has_public_ipv6 to return False
-                            with patch(
-                                "wormhole.handler.has_public_ipv6",
-                                return_value=False,
-                            ):
-                                result = await _resolve_and_validate_host(
-                                    host, context, False
-                                )
-
-                                # Should return the IP list from resolver
-                                assert result == ["93.184.216.34"]
-
-    @pytest.mark.asyncio
+        with (
+            # (ip_list, ttl_expiration)
+            patch.dict(
+                "wormhole.handler.DNS_CACHE._data",
+                {"example.com": (["93.184.216.34"], 100)},
+                clear=True,
+            ),
+            # Make the cache entry expired
+            patch("wormhole.handler.time.monotonic", return_value=100000),
+            patch("wormhole.handler.resolver") as mock_resolver,
+        ):
+            # IP with 300s TTL
+            mock_resolver.resolve_with_ttl = lambda _host: done(
+                (["93.184.216.34"], 300)
+            )
+
+            result = await _resolve_and_validate_host(host, context, False)
+
+        # Should return the IP list from resolver
+        assert result == ["93.184.216.34"]
+
     async def test_resolve_and_validate_host_resolution_failure(self, context):
         """Test DNS resolution failure."""
         host = "nonexistent.example.com"
 
-        # Mock the is_ad_domain function to return False
-        with patch("wormhole.handler.is_ad_domain", return_value=False):
-            # Mock the resolver to raise an OSError
-            with patch("wormhole.handler.resolver") as mock_resolver:
-                mock_resolver.resolve_with_ttl = AsyncMock(
-                    side_effect=OSError("DNS resolution failed")
-                )
+        with patch("wormhole.handler.resolver") as mock_resolver:
+            mock_resolver.resolve_with_ttl = AsyncMock(
+                side_effect=OSError("DNS resolution failed")
+            )
 
-                with pytest.raises(OSError) as exc_info:
-                    await _resolve_and_validate_host(host, context, False)
+            with pytest.raises(OSError) as exc_info:
+                await _resolve_and_validate_host(host, context, False)
 
-                assert "Failed to resolve host" in str(exc_info.value)
+        assert "Failed to resolve host" in str(exc_info.value)
 
-    @pytest.mark.asyncio
-    async def test_resolve_and_validate_host_only_private_ips(self, context):
+    async def test_resolve_and_validate_host_only_private_ips(
+        self, context, done, handler_safeguards
+    ):
         """Test when host resolves to only private IPs."""
         host = "private.example.com"
+        handler_safeguards["is_private_ip"].return_value = True
+
+        with patch("wormhole.handler.resolver") as mock_resolver:
+            mock_resolver.resolve_with_ttl = lambda _host: done(
+                (["192.168.1.1"], 300)
+            )
 
-        # Mock the is_ad_domain function to return False
-        with patch("wormhole.handler.is_ad_domain", return_value=False):
-            # Mock the resolver to return a private IP and TTL
-            with patch("wormhole.handler.resolver") as mock_resolver:
-                mock_resolver.resolve_with_ttl = AsyncMock(
-                    return_value=(["192.168.1.1"], 300)
-                )
-
-                # Mock is_private_ip to return True for the IP
-                with patch("wormhole.handler.is_private_ip", return_value=True):
-                    with pytest.raises(PermissionError) as exc_info:
-                        await _resolve_and_validate_host(host, context, False)
-
-                    assert "Blocked access to 'private.example.com'" in str(
-                        exc_info.value
-                    )
-
-    @pytest.mark.asyncio
-    async def test_resolve_and_validate_host_allow_private(self, context):
+            with pytest.raises(PermissionError) as exc_info:
+                await _resolve_and_validate_host(host, context, False)
+
+        assert "Blocked access to 'private.example.com'" in str(exc_info.value)
+
+    async def test_resolve_and_validate_host_allow_private(
+        self, context, done, handler_safeguards
+    ):
         """Test when private IPs are allowed."""
         host = "private.example.com"
-
-        # Mock the is_ad_domain function to return False
-        with patch("wormhole.handler.is_ad_domain", return_value=False):
-            # Mock the resolver to return a private IP and TTL
-            with patch("wormhole.handler.resolver") as mock_resolver:
-                mock_resolver.resolve_with_ttl = AsyncMock(
-                    return_value=(["192.168.1.1"], 300)
-                )
-
-                # Mock is_private_ip to return True for the IP
-                with patch("wormhole.handler.is_private_ip", return_value=True):
-                    result = await _resolve_and_validate_host(
-                        host, context, True
-                    )  # allow_private=True
-
-                    # Should return the private IP since it's allowed
-                    assert result == ["192.168.1.1"]
+        handler_safeguards["is_private_ip"].return_value = True
+
+        with patch("wormhole.handler.resolver") as mock_resolver:
+            mock_resolver.resolve_with_ttl = lambda _host: done(
+                (["192.168.1.1"], 300)
+            )
+
+            # allow_private=True
+            result = await _resolve_and_validate_host(host, context, True)
+
+        # Should return the private IP since it's allowed
+        assert result == ["192.168.1.1"]
+
+    async def test_resolve_and_validate_host_allow_private_drops_invalid(
+        self, context, done, handler_safeguards
+    ):
+        """Test that allowing private IPs still drops non-IP strings."""
+        host = "mixed.example.com"
+        handler_safeguards["has_public_ipv6"].return_value = True
+
+        with patch("wormhole.handler.resolver") as mock_resolver:
+            mock_resolver.resolve_with_ttl = lambda _host: done(
+                (["not-an-ip", "fd00::1", "10.0.0.1"], 300)
+            )
+            result = await _resolve_and_validate_host(host, context, True)
+
+        # IPv6 first since the machine has public IPv6, then IPv4
+        assert result == ["fd00::1", "10.0.0.1"]
@@ -4,11 +4,36 @@ Unit tests for the resolver module.
 """
 import pytest
 import asyncio
-from unittest.mock import AsyncMock, Mock, patch, mock_open
+import io
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
 from wormhole.resolver import Resolver, resolver
 import aiodns
 
 
+@pytest.fixture(scope="module")
+def resolver_instance():
+    """
+    Get the resolver singleton, initialized once for the module.
+
+    Returns:
+        Resolver: The shared resolver with verbose=1 and the hosts file loaded.
+    """
+    instance = Resolver.get_instance()
+    instance.initialize(verbose=1)
+    return instance
+
+
+@pytest.fixture(autouse=True)
+def _restore_resolver_state(resolver_instance):
+    """Undo changes a test makes to the shared resolver's state."""
+    hosts_cache = resolver_instance.hosts_cache.copy()
+    verbose = resolver_instance.verbose
+    yield
+    resolver_instance.hosts_cache = hosts_cache
+    resolver_instance.verbose = verbose
+
+
 class TestResolver:
     """Test cases for the Resolver class."""
 
@@ -20,54 +45,49 @@ class TestResolver:
         # Should be the same instance
         assert resolver1 is resolver2
 
-    def test_resolver_initialize(self):
+    def test_resolver_initialize(self, resolver_instance):
         """Test initializing the resolver."""
-        resolver_instance = Resolver.get_instance()
         resolver_instance.initialize(verbose=2)
 
         # Should set the verbose level
         assert resolver_instance.verbose == 2
 
-    def test_get_hosts_path_windows(self):
+    def test_get_hosts_path_windows(self, resolver_instance, monkeypatch):
         """Test getting hosts path on Windows."""
-        with patch("sys.platform", "win32"):
-            with patch("os.environ", {"SYSTEMROOT": "/windows"}):
-                resolver_instance = Resolver.get_instance()
-                hosts_path = resolver_instance._get_hosts_path()
+        monkeypatch.setattr("wormhole.resolver.sys.platform", "win32")
+        with patch.dict("os.environ", {"SYSTEMROOT": "/windows"}):
+            hosts_path = resolver_instance._get_hosts_path()
 
-                # Should return Windows hosts path
-                assert str(hosts_path) == "/windows/System32/drivers/etc/hosts"
+        # Should return Windows hosts path
+        assert str(hosts_path) == "/windows/System32/drivers/etc/hosts"
 
-    @patch("platform.system", return_value="Linux")
-    def test_get_hosts_path_unix(self, mock_system):
+    @pytest.mark.parametrize("platform_name", ["linux", "darwin"])
+    def test_get_hosts_path_unix(
+        self, resolver_instance, monkeypatch, platform_name
+    ):
         """Test getting hosts path on Unix-like systems."""
-        resolver_instance = Resolver.get_instance()
+        monkeypatch.setattr("wormhole.resolver.sys.platform", platform_name)
         hosts_path = resolver_instance._get_hosts_path()
 
         # Should return Unix hosts path
         assert str(hosts_path) == "/etc/hosts"
 
-    @patch(
-        "builtins.open",
-        new_callable=mock_open,
-        read_data="127.0.0.1 localhost\n192.168.1.1 example.com # comment\n",
-    )
-    @patch("pathlib.Path.exists", return_value=True)
-    def test_load_hosts_file_success(self, mock_exists, mock_file):
+    def test_load_hosts_file_success(self, resolver_instance):
         """Test successfully loading hosts file."""
-        resolver_instance = Resolver.get_instance()
-        resolver_instance.initialize(verbose=1)
-        resolver_instance._load_hosts_file()
+        data = "127.0.0.1 localhost\n192.168.1.1 example.com # comment\n"
+        with (
+            patch("builtins.open", return_value=io.StringIO(data)),
+            patch("pathlib.Path.exists", return_value=True),
+        ):
+            resolver_instance._load_hosts_file()
 
         # Should have loaded the hosts
         assert resolver_instance.hosts_cache["localhost"] == "127.0.0.1"
         assert resolver_instance.hosts_cache["example.com"] == "192.168.1.1"
 
     @patch("pathlib.Path.exists", return_value=False)
-    def test_load_hosts_file_not_found(self, mock_exists):
+    def test_load_hosts_file_not_found(self, mock_exists, resolver_instance):
         """Test loading hosts file when it doesn't exist."""
-        resolver_instance = Resolver.get_instance()
-        resolver_instance.initialize(verbose=1)
         # Save original cache
         original_cache = resolver_instance.hosts_cache.copy()
         resolver_instance._load_hosts_file()
@@ -77,10 +97,10 @@ class TestResolver:
 
     @patch("builtins.open", side_effect=Exception("Permission denied"))
     @patch("pathlib.Path.exists", return_value=True)
-    def test_load_hosts_file_error(self, mock_exists, mock_file):
+    def test_load_hosts_file_error(
+        self, mock_exists, mock_file, resolver_instance
+    ):
         """Test loading hosts file when there's an error."""
-        resolver_instance = Resolver.get_instance()
-        resolver_instance.initialize(verbose=1)
         # Save original cache
         original_cache = resolver_instance.hosts_cache.copy()
         resolver_instance._load_hosts_file()
@@ -88,11 +108,8 @@ class TestResolver:
         # Should not modify the existing cache
         assert resolver_instance.hosts_cache == original_cache
 
-    @pytest.mark.asyncio
-    async def test_resolve_from_hosts_cache(self):
+    async def test_resolve_from_hosts_cache(self, resolver_instance):
         """Test resolving hostname from hosts cache."""
-        resolver_instance = Resolver.get_instance()
-        resolver_instance.initialize(verbose=1)
         resolver_instance.hosts_cache["example.com"] = "192.168.1.1"
 
         result = await resolver_instance.resolve("example.com")
@@ -100,25 +117,24 @@ class TestResolver:
         # Should return the cached IP
         assert result == ["192.168.1.1"]
 
-    @pytest.mark.asyncio
-    async def test_resolve_dns_success(self):
+    async def test_resolve_dns_success(self, resolver_instance):
         """Test resolving hostname via DNS."""
-        resolver_instance = Resolver.get_instance()
-        resolver_instance.initialize(verbose=1)
         resolver_instance.hosts_cache = {}  # Clear cache
 
-        # Mock DNS resolver
-        mock_dns_resolver = AsyncMock()
-        mock_dns_resolver.query = AsyncMock(
-            side_effect=[
-                [Mock(host="93.184.216.34", ttl=300)],  # A record with TTL
-                [
-                    Mock(
-                        host="2606:2800:220:1:248:1893:25c8:1946", ttl=600
-                    )  # AAAA record with TTL
-                ],
-            ]
-        )
+        # Answer each record type with a plain record object
+        records = {
+            "A": [SimpleNamespace(host="93.184.216.34", ttl=300)],
+            "AAAA": [
+                SimpleNamespace(
+                    host="2606:2800:220:1:248:1893:25c8:1946", ttl=600
+                )
+            ],
+        }
+
+        async def fake_query(host, qtype):
+            return records[qtype]
+
+        mock_dns_resolver = SimpleNamespace(query=fake_query)
 
         with patch.object(resolver_instance, "resolver", mock_dns_resolver):
             result = await resolver_instance.resolve("example.com")
@@ -127,11 +143,8 @@ class TestResolver:
             assert "93.184.216.34" in result
             assert "2606:2800:220:1:248:1893:25c8:1946" in result
 
-    @pytest.mark.asyncio
-    async def test_resolve_dns_failure(self):
+    async def test_resolve_dns_failure(self, resolver_instance):
         """Test resolving hostname when DNS fails."""
-        resolver_instance = Resolver.get_instance()
-        resolver_instance.initialize(verbose=1)
         resolver_instance.hosts_cache = {}  # Clear cache
 
         # Mock DNS resolver to raise an error
@@ -27,6 +27,8 @@ class TestSafeguards:
         ALLOW_LIST_SET.clear()
         # Add back the default allowlist
         ALLOW_LIST_SET.update(DEFAULT_ALLOWLIST)
+        # Drop verdicts cached against the previous sets
+        is_ad_domain.cache_clear()
 
     def test_is_private_ip_private_ipv4(self):
         """Test is_private_ip with private IPv4 addresses."""
@@ -241,3 +243,15 @@ class TestSafeguards:
         """Test is_ad_domain with default behavior."""
         result = is_ad_domain("unknown.example.com")
         assert result is False
+
+    def test_is_ad_domain_cache_cleared_by_load_allowlist(self, tmp_path):
+        """Test that loading an allowlist invalidates cached verdicts."""
+        AD_BLOCK_SET.add("example.com")
+        assert is_ad_domain("www.example.com") is True
+
+        allowlist = tmp_path / "allowlist.txt"
+        allowlist.write_text("www.example.com\n")
+        context = RequestContext({"id": "test", "client": "127.0.0.1"}, 1)
+        load_allowlist(str(allowlist), "127.0.0.1", context)
+
+        assert is_ad_domain("www.example.com") is False
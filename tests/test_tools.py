@@ -52,26 +52,26 @@ class TestTools:
         assert host == "example.com"
         assert port == 80  # Default port
 
-    # Note: The current implementation doesn't properly handle IPv6 addresses
-    # These tests reflect the current behavior, not ideal IPv6 handling
-
     def test_get_host_and_port_ipv6_with_port(self):
-        """Test get_host_and_port with IPv6-like string and port."""
+        """Test get_host_and_port with a bracketed IPv6 address and port."""
         host_port = "[2001:db8::1]:8080"
         host, port = get_host_and_port(host_port)
-        # Current implementation incorrectly parses this
-        # This test documents current behavior
-        assert host == "[2001:db8:"  # Incorrectly parsed
-        assert port == 1  # Incorrectly parsed
+        assert host == "2001:db8::1"
+        assert port == 8080
+
+    def test_get_host_and_port_ipv6_bracketed_without_port(self):
+        """Test get_host_and_port with a bracketed IPv6 address without port."""
+        host_port = "[2001:db8::1]"
+        host, port = get_host_and_port(host_port, default_port="443")
+        assert host == "2001:db8::1"
+        assert port == 443
 
     def test_get_host_and_port_ipv6_without_port(self):
-        """Test get_host_and_port with IPv6-like string without port."""
+        """Test get_host_and_port with a bare IPv6 address without port."""
         host_port = "2001:db8::1"
         host, port = get_host_and_port(host_port)
-        # Current implementation incorrectly parses this
-        # This test documents current behavior
-        assert host == "2001:db8:"
-        assert port == 1
+        assert host == "2001:db8::1"
+        assert port == 80  # Default port
 
     def test_get_host_and_port_custom_default_port(self):
         """Test get_host_and_port with custom default port."""
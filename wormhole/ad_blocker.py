@@ -15,11 +15,21 @@ BLOCKLIST_URLS: list[str] = [
     "https://raw.githubusercontent.com/AdAway/adaway.github.io/master/hosts.txt",
 ]
 
+# Patterns for the domain in a hosts file line and an Adblock Plus rule
+_HOSTS_PATTERN = r"(?:[0-9]{1,3}\.){3}[0-9]{1,3}[ \t]+([a-zA-Z0-9.-]+)"
+_ADBLOCK_PATTERN = r"\|\|([a-zA-Z0-9.-]+)\^"
+
 # Regex to find domains in various blocklist formats
-# Handles formats like: 0.0.0.0 example.com, ||example.com^, and just example.com
-DOMAIN_REGEX = re.compile(
-    r"^(?:[0-9]{1,3}\.){3}[0-9]{1,3}\s+([a-zA-Z0-9.-]+)|"  # For hosts file format
-    r"^\|\|([a-zA-Z0-9.-]+)\^"  # For Adblock Plus format
+# Handles formats like: 0.0.0.0 example.com, ||example.com^
+DOMAIN_REGEX = re.compile(f"^{_HOSTS_PATTERN}|^{_ADBLOCK_PATTERN}")
+
+# Regex to find domains in a whole blocklist in a single pass. Adds a fallback
+# for plain domain lists: a line with a dot and no spaces is taken as is.
+# Comment lines (starting with '#' or '!') never match.
+CONTENT_DOMAIN_REGEX = re.compile(
+    rf"^[ \t]*(?:{_HOSTS_PATTERN}|{_ADBLOCK_PATTERN}|"
+    r"(?=[^ \r\n]*\.)([^\s#!][^ \r\n]*?)[ \t\r]*$)",
+    re.MULTILINE,
 )
 
 
@@ -77,31 +87,21 @@ def _parse_domains_from_content(content: str) -> set[str]:
     Returns:
         set[str]: A set of valid domain names extracted from the content.
     """
-    domains: set[str] = set()
-    for line in content.splitlines():
-        line = line.strip()
-        if not line or line.startswith("#") or line.startswith("!"):
-            continue
-
-        match = DOMAIN_REGEX.match(line)
-        if match:
-            # The regex has two capture groups, one will be None
-            domain = match.group(1) or match.group(2)
-            if domain:
-                domains.add(domain.lower())
-        # Fallback for simple domain lists
-        elif "." in line and " " not in line:
-            domains.add(line.lower())
-    return domains
+    # The regex has three capture groups, only one is set per match
+    return {
+        (hosts or adblock or plain).lower()
+        for hosts, adblock, plain in CONTENT_DOMAIN_REGEX.findall(content)
+    }
 
 
 def _filter_redundant_domains(domains: set[str]) -> set[str]:
     """
     Optimizes a set of domains by removing redundant subdomains.
 
-    This function iterates through the set of domains, removing any that are
-    subdomains of a longer domain already present in the set. It ensures that only
-    top-level domains are kept, effectively optimizing the blocklist for ad-blocking.
+    A domain is dropped when any of its parent domains (excluding bare TLDs)
+    is also in the set, since blocking the parent already covers it. Each
+    domain is checked against the original set, so the result does not
+    depend on iteration order and no sorting is needed.
 
     Args:
         domains (set[str]): A set of domain names to be optimized.
@@ -109,19 +109,19 @@ def _filter_redundant_domains(domains: set[str]) -> set[str]:
     Returns:
         set[str]: A set of optimized domain names with redundant subdomains removed.
     """
-    # Sort by length descending to ensure we process subdomains before parents
-    sorted_domains: list[str] = sorted(list(domains), key=len, reverse=True)
-    optimized_set: set[str] = set(sorted_domains)
-
-    for domain in sorted_domains:
-        parts = domain.split(".")
-        # Check for parents of the current domain
-        for i in range(1, len(parts) - 1):
-            parent = ".".join(parts[i:])
-            if parent in optimized_set:
-                # If a parent domain exists in the set, this subdomain is redundant.
-                optimized_set.discard(domain)
-                break  # Found a parent, no need to check further.
+    optimized_set: set[str] = set()
+    for domain in domains:
+        # Walk the parent suffixes by dot position, without splitting/joining.
+        dot = domain.find(".")
+        while True:
+            next_dot = domain.find(".", dot + 1)
+            if next_dot < 0:
+                # Only the TLD is left; no redundant parent was found.
+                optimized_set.add(domain)
+                break
+            if domain[dot + 1 :] in domains:
+                break  # Found a parent, this subdomain is redundant.
+            dot = next_dot
 
     return optimized_set
 
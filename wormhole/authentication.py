@@ -1,6 +1,9 @@
+from functools import lru_cache
 from pathlib import Path
 import asyncio
+import binascii
 import hashlib
+import hmac
 import re
 import secrets
 
@@ -8,9 +11,24 @@ import secrets
 REALM: str = "Wormhole Proxy"
 HASH_ALGORITHM = hashlib.sha256
 
-# Caches for performance
-_auth_file_cache: dict = {}
-_auth_file_mtime: float = 0.0
+# Stand-in HA1 for unknown users, so a failed user lookup costs the same
+# digest work as a wrong password and does not reveal which usernames exist.
+_DUMMY_HA1: str = HASH_ALGORITHM(b"").hexdigest()
+
+# Lower-cased header name prefix, compared against a slice of each header.
+_PROXY_AUTH_PREFIX: str = "proxy-authorization:"
+_PROXY_AUTH_PREFIX_LEN: int = len(_PROXY_AUTH_PREFIX)
+
+# The 407 response is fixed apart from the nonce and opaque of each challenge.
+# qop="auth" means quality of protection is authentication.
+_AUTH_REQUIRED_RESPONSE: bytes = (
+    b"HTTP/1.1 407 Proxy Authentication Required\r\n"
+    b'Proxy-Authenticate: Digest realm="'
+    + REALM.encode("ascii")
+    + b'", qop="auth", algorithm=SHA-256, nonce="%s", opaque="%s"\r\n'
+    b"Connection: close\r\n"
+    b"\r\n"
+)
 
 
 def get_ident(
@@ -35,9 +53,36 @@ def get_ident(
     return {"id": hex(id(reader))[-6:], "client": client_id}
 
 
+# This regex matches "user:realm:hash" lines, surrounding whitespace ignored
+AUTH_LINE_RE = re.compile(r"^[ \t]*([^:\n]*):([^:\n]*):(.*?)[ \t]*$", re.M)
+
+
+@lru_cache(maxsize=4)
+def _parse_auth_file(path: Path, mtime_ns: int) -> dict[str, dict[str, str]]:
+    """
+    Parses the authentication file. Results are cached per path and
+    modification time, so the file is only re-read after it changes.
+
+    Args:
+        path (Path): The path to the authentication file.
+        mtime_ns (int): The file's modification time, used as a cache key.
+
+    Returns:
+        dict[str, dict[str, str]]: A dictionary of user credentials.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    # Malformed lines simply don't match and are ignored.
+    return {
+        user: {"realm": realm, "hash": hash_val}
+        for user, realm, hash_val in AUTH_LINE_RE.findall(content)
+    }
+
+
 def _load_auth_file(path: Path) -> dict | None:
     """
-    Loads and caches the authentication file if it has been modified.
+    Loads the authentication file, reusing the cached parse unless the file
+    has been modified.
 
     Args:
         path (Path): The path to the authentication file.
@@ -45,23 +90,10 @@ def _load_auth_file(path: Path) -> dict | None:
     Returns:
         dict | None: A dictionary of user credentials if the file is successfully loaded, None otherwise.
     """
-    global _auth_file_cache, _auth_file_mtime
     try:
-        current_mtime = path.stat().st_mtime
-        if current_mtime > _auth_file_mtime:
-            users = {}
-            with open(path, "r", encoding="utf-8") as f:
-                for line in f:
-                    try:
-                        user, realm, hash_val = line.strip().split(":", 2)
-                        users[user] = {"realm": realm, "hash": hash_val}
-                    except ValueError:
-                        continue  # Ignore malformed lines
-            _auth_file_cache = users
-            _auth_file_mtime = current_mtime
+        return _parse_auth_file(path, path.stat().st_mtime_ns)
     except FileNotFoundError:
         return None
-    return _auth_file_cache
 
 
 # This regex handles quoted and unquoted values
@@ -83,6 +115,22 @@ def _parse_digest_header(header_value: str) -> dict[str, str]:
     return {key: val1 or val2 for key, val1, val2 in parts}
 
 
+@lru_cache(maxsize=1024)
+def _compute_ha2(method: str, uri: str) -> str:
+    """
+    Computes the Digest HA2 hash. A client repeats the same method and URI
+    across requests (e.g. every CONNECT to the same host), so it is memoized.
+
+    Args:
+        method (str): The HTTP method (e.g., 'CONNECT').
+        uri (str): The URI from the Digest authentication header.
+
+    Returns:
+        str: The hex-encoded HA2 hash.
+    """
+    return HASH_ALGORITHM(f"{method}:{uri}".encode("utf-8")).hexdigest()
+
+
 async def send_auth_required_response(writer: asyncio.StreamWriter) -> None:
     """
     Sends a 407 Proxy Authentication Required with a new SHA-256 Digest challenge.
@@ -90,23 +138,11 @@ async def send_auth_required_response(writer: asyncio.StreamWriter) -> None:
     Args:
         writer: asyncio.StreamWriter, The writer stream for the connection.
     """
-    nonce = secrets.token_hex(16)
-    opaque = secrets.token_hex(16)
-    # qop="auth" means quality of protection is authentication.
-    challenge = (
-        f'Digest realm="{REALM}", '
-        f'qop="auth", '
-        f"algorithm=SHA-256, "
-        f'nonce="{nonce}", '
-        f'opaque="{opaque}"'
-    )
-    response_header = (
-        b"HTTP/1.1 407 Proxy Authentication Required\r\n"
-        b"Proxy-Authenticate: %s\r\n"
-        b"Connection: close\r\n"
-        b"\r\n"
-    ) % challenge.encode("ascii")
-    writer.write(response_header)
+    # Draw the nonce and opaque values from a single CSPRNG call, hex-encoded
+    # straight to bytes so the challenge needs no str round trip.
+    token = binascii.hexlify(secrets.token_bytes(32))
+    nonce, opaque = token[:32], token[32:]
+    writer.write(_AUTH_REQUIRED_RESPONSE % (nonce, opaque))
     await writer.drain()
 
 
@@ -130,8 +166,13 @@ async def verify_credentials(
     Returns:
         dict[str, str] | None: A dictionary containing user information if credentials are valid, None otherwise.
     """
+    # Lower-case only the prefix, not whole (possibly long) headers.
     auth_header_full = next(
-        (h for h in headers if h.lower().startswith("proxy-authorization:")),
+        (
+            h
+            for h in headers
+            if h[:_PROXY_AUTH_PREFIX_LEN].lower() == _PROXY_AUTH_PREFIX
+        ),
         None,
     )
 
@@ -147,20 +188,16 @@ async def verify_credentials(
         return None
 
     try:
-        auth_header_val = auth_header_full.split(" ", 1)[1]
+        _, _, auth_header_val = auth_header_full.partition(" ")
         params = _parse_digest_header(auth_header_val)
         username = params["username"]
 
         # 3. Look up the user and their stored HA1 hash
         user_data = users.get(username)
-        if not user_data:
-            await send_auth_required_response(writer)
-            return None
-        ha1 = user_data["hash"]
+        ha1 = user_data["hash"] if user_data else _DUMMY_HA1
 
         # 4. Calculate HA2 on the server using the URI *from the auth header*
-        ha2_data = f"{method}:{params['uri']}".encode("utf-8")
-        ha2 = HASH_ALGORITHM(ha2_data).hexdigest()
+        ha2 = _compute_ha2(method, params["uri"])
 
         # 5. Calculate the expected response hash
         response_data = (
@@ -169,12 +206,19 @@ async def verify_credentials(
         ).encode("utf-8")
         valid_response = HASH_ALGORITHM(response_data).hexdigest()
 
-        # 6. Compare the client's response with our calculated one
-        if secrets.compare_digest(valid_response, params["response"]):
+        # 6. Compare the client's response with our calculated one in
+        # constant time, as bytes so non-ASCII input cannot raise TypeError.
+        if (
+            hmac.compare_digest(
+                valid_response.encode("ascii"),
+                params["response"].encode("utf-8"),
+            )
+            and user_data
+        ):
             # Success!
             return get_ident(reader, writer, user=username)
 
-    except (KeyError, IndexError):
+    except KeyError:
         # This catches malformed headers or missing parameters
         pass
 
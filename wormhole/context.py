@@ -1,29 +1,45 @@
-from typing import Dict, Any
+from dataclasses import dataclass, field
+from typing import Dict
 import time
 
 
+@dataclass(slots=True, eq=False)
 class RequestContext:
     """
     A context object that encapsulates request-specific information and shared state
     to reduce function call overhead by minimizing parameter passing.
+
+    Attributes:
+        ident: Dictionary containing identifier and client details
+        verbose: Verbosity level for logging
+        client_ip: Client address taken from ident, or "unknown"
     """
 
-    def __init__(
-        self,
-        ident: Dict[str, str],
-        verbose: int = 0,
-    ) -> None:
+    ident: Dict[str, str]
+    verbose: int = 0
+    # Integer nanoseconds from the monotonic clock: cheaper to read than
+    # time.time() and immune to wall-clock adjustments.
+    _start_ns: int = field(
+        default_factory=time.monotonic_ns, init=False, repr=False
+    )
+    client_ip: str = field(init=False)
+
+    def __post_init__(self) -> None:
+        """
+        Derive the client IP from the identifier.
+        """
+        self.client_ip = self.ident.get("client", "unknown")
+
+    @property
+    def start_time(self) -> float:
         """
-        Initialize the request context.
+        Get the monotonic clock reading, in seconds, when the request started.
 
-        Args:
-            ident: Dictionary containing identifier and client details
-            verbose: Verbosity level for logging
+        Returns:
+            float: Start time in seconds (only meaningful relative to other
+            time.monotonic() readings)
         """
-        self.ident = ident
-        self.verbose = verbose
-        self.start_time = time.time()
-        self.client_ip = ident.get("client", "unknown")
+        return self._start_ns * 1e-9
 
     def get_elapsed_time(self) -> float:
         """
@@ -32,4 +48,4 @@ class RequestContext:
         Returns:
             float: Elapsed time in seconds
         """
-        return time.time() - self.start_time
+        return (time.monotonic_ns() - self._start_ns) * 1e-9
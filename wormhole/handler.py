@@ -3,19 +3,139 @@ from .safeguards import has_public_ipv6, is_ad_domain, is_private_ip
 from .tools import get_content_length, get_host_and_port
 from .resolver import resolver
 from .context import RequestContext
+from collections import OrderedDict
+from itertools import zip_longest
 import asyncio
+import heapq
 import ipaddress
 import random
 import time
 
 # --- DNS Cache for Performance ---
-DNS_CACHE: dict[str, tuple[list[str], float, float]] = (
-    {}
-)  # (ip_list, timestamp, ttl_expiration)
+
+
+class _DnsCache:
+    """
+    A size-bounded LRU cache of resolved hosts whose entries expire with the
+    TTL of their DNS records.
+
+    Expired entries are dropped lazily when looked up, and in bulk on every
+    insert via a heap of expiration times, so hosts that are never requested
+    again do not accumulate.
+    """
+
+    def __init__(self, max_size: int = 10_000) -> None:
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_size (int, optional): Maximum number of hosts kept. Defaults to 10000.
+        """
+        self.max_size = max_size
+        # host -> (ip_list, ttl_expiration) on the time.monotonic() clock,
+        # least recently used first
+        self._data: OrderedDict[str, tuple[list[str], float]] = OrderedDict()
+        # (ttl_expiration, host) min-heap; may hold stale pairs for hosts
+        # that were refreshed or evicted since.
+        self._expirations: list[tuple[float, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, host: str) -> bool:
+        return host in self._data
+
+    def __getitem__(self, host: str) -> tuple[list[str], float]:
+        return self._data[host]
+
+    def clear(self) -> None:
+        """Removes all entries."""
+        self._data.clear()
+        self._expirations.clear()
+
+    def get(self, host: str) -> list[str] | None:
+        """
+        Looks up a host, evicting its entry if the TTL has passed.
+
+        Args:
+            host (str): The hostname to look up.
+
+        Returns:
+            list[str] | None: The cached IP list, or None on a miss.
+        """
+        entry = self._data.get(host)
+        if entry is None:
+            return None
+        if time.monotonic() >= entry[1]:
+            del self._data[host]
+            return None
+        self._data.move_to_end(host)
+        return entry[0]
+
+    def set(self, host: str, ip_list: list[str], ttl: float) -> None:
+        """
+        Caches the IPs of a host, evicting expired and least recently used entries.
+
+        Args:
+            host (str): The hostname.
+            ip_list (list[str]): The resolved IP addresses.
+            ttl (float): Seconds until the entry expires.
+        """
+        now = time.monotonic()
+        ttl_expiration = now + ttl
+        self._data[host] = (ip_list, ttl_expiration)
+        self._data.move_to_end(host)
+        heapq.heappush(self._expirations, (ttl_expiration, host))
+
+        # Drain expired heads, skipping pairs superseded by a newer entry.
+        while self._expirations and self._expirations[0][0] <= now:
+            expiration, expired_host = heapq.heappop(self._expirations)
+            entry = self._data.get(expired_host)
+            if entry is not None and entry[1] == expiration:
+                del self._data[expired_host]
+
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+        # Rebuild the heap if stale pairs from evicted or refreshed hosts
+        # start to dominate it.
+        if len(self._expirations) > 2 * self.max_size:
+            self._expirations = [
+                (entry[1], cached_host)
+                for cached_host, entry in self._data.items()
+            ]
+            heapq.heapify(self._expirations)
+
+
+DNS_CACHE = _DnsCache()
+
+# Bounds, in seconds, applied to record TTLs before caching. The floor keeps
+# zero or one-second TTLs from forcing a lookup on nearly every request, and
+# the ceiling limits how long a stale answer can outlive a DNS change.
+DNS_MIN_TTL: int = 10
+DNS_MAX_TTL: int = 3600
+
+# Lookups currently in progress, so concurrent misses for one host share them.
+DNS_INFLIGHT: dict[str, asyncio.Task] = {}
+
+# Head start, in seconds, each connection attempt gets before the next IP is
+# tried in parallel (the RFC 8305 recommended value).
+HAPPY_EYEBALLS_DELAY: float = 0.25
+
+# Fixed status-only responses written to the client.
+_CONNECTION_ESTABLISHED_RESPONSE: bytes = (
+    b"HTTP/1.1 200 Connection established\r\n\r\n"
+)
+_BAD_REQUEST_RESPONSE: bytes = b"HTTP/1.1 400 Bad Request\r\n\r\n"
+_FORBIDDEN_RESPONSE: bytes = b"HTTP/1.1 403 Forbidden\r\n\r\n"
+_BAD_GATEWAY_RESPONSE: bytes = b"HTTP/1.1 502 Bad Gateway\r\n\r\n"
 
 
 # --- Modernized Relay Stream Function ---
 
+# Upper bound on bytes pulled from the reader per relay iteration.
+RELAY_CHUNK_SIZE: int = 65536
+
 
 async def relay_stream(
     reader: asyncio.StreamReader,
@@ -41,7 +161,7 @@ async def relay_stream(
     first_line: bytes | None = None
     try:
         while not reader.at_eof():
-            data = await reader.read(4096)
+            data = await reader.read(RELAY_CHUNK_SIZE)
             if not data:
                 break
 
@@ -50,6 +170,8 @@ async def relay_stream(
                     first_line = data[:end_of_line]
 
             writer.write(data)
+            # Returns immediately unless the transport paused writing, so
+            # this only waits when the peer is slower than the source.
             await writer.drain()
     except (ConnectionResetError, BrokenPipeError) as e:
         logger.debug(
@@ -96,9 +218,10 @@ async def _resolve_and_validate_host(
         raise PermissionError(f"Blocked ad domain")
 
     # Check cache first
-    if host in DNS_CACHE:
-        ip_list, timestamp, ttl_expiration = DNS_CACHE[host]
-        if time.time() < ttl_expiration:
+    if (ip_list := DNS_CACHE.get(host)) is not None:
+        # Debug output is only enabled with -v, so skip building the
+        # message on this per-request path otherwise.
+        if context.verbose > 0:
             logger.debug(
                 flm(
                     f"DNS cache hit for '{host}'. ({len(DNS_CACHE)} hosts cached)",
@@ -106,8 +229,56 @@ async def _resolve_and_validate_host(
                     context.verbose,
                 )
             )
-            return ip_list
+        return ip_list
+
+    # Join an in-flight lookup for this host or start one. The lookup runs as
+    # its own task and is shielded, so a client that disconnects mid-lookup
+    # does not cancel it for the other clients waiting on the same host.
+    lookup = DNS_INFLIGHT.get(host)
+    if lookup is None:
+        lookup = asyncio.create_task(
+            _lookup_and_cache_host(host, context, allow_private)
+        )
+        DNS_INFLIGHT[host] = lookup
+        lookup.add_done_callback(lambda task: _finish_lookup(host, task))
+    return await asyncio.shield(lookup)
+
+
+def _finish_lookup(host: str, task: asyncio.Task) -> None:
+    """
+    Removes a finished lookup from DNS_INFLIGHT.
 
+    Also retrieves the lookup's exception: if every waiter was cancelled,
+    nothing else awaits the shielded task and asyncio would log "Task
+    exception was never retrieved" for a failed lookup.
+
+    Args:
+        host (str): The hostname the lookup resolved.
+        task (asyncio.Task): The finished lookup task.
+    """
+    DNS_INFLIGHT.pop(host, None)
+    if not task.cancelled():
+        task.exception()
+
+
+async def _lookup_and_cache_host(
+    host: str, context: RequestContext, allow_private: bool
+) -> list[str]:
+    """
+    Resolves a hostname, filters and orders its IPs, and stores them in DNS_CACHE.
+
+    Args:
+        host (str): The hostname to resolve.
+        context (RequestContext): The request context containing ident and verbose level.
+        allow_private (bool): Whether to allow private IP addresses.
+
+    Returns:
+        list[str]: A list of valid IP addresses.
+
+    Raises:
+        PermissionError: If the host resolves to only private IPs.
+        OSError: If the host cannot be resolved.
+    """
     # Resolve hostname using aiodns resolver with TTL information
     try:
         resolved_ips, min_ttl = await resolver.resolve_with_ttl(host)
@@ -117,38 +288,46 @@ async def _resolve_and_validate_host(
     # Security Check and IP version separation
     valid_ipv4s, valid_ipv6s = [], []
     for ip_str in resolved_ips:
-        # Bypass the private IP check if the flag is set.
-        if allow_private or not is_private_ip(ip_str):
+        # Bypass the private IP check if the flag is set, but still drop
+        # strings that are not IP addresses; is_private_ip rejects those.
+        if allow_private:
             try:
-                ip_obj = ipaddress.ip_address(ip_str)
-                if ip_obj.version == 4:
-                    valid_ipv4s.append(ip_str)
-                elif ip_obj.version == 6:
-                    valid_ipv6s.append(ip_str)
+                ipaddress.ip_address(ip_str)
             except ValueError:
                 continue
+        elif is_private_ip(ip_str):
+            continue
+
+        # Only IPv6 addresses contain colons, so no second parse is needed.
+        if ":" in ip_str:
+            valid_ipv6s.append(ip_str)
+        else:
+            valid_ipv4s.append(ip_str)
 
     # Prioritization and shuffling for load balancing
-    final_ip_list = []
+    random.shuffle(valid_ipv6s)
+    random.shuffle(valid_ipv4s)
     if has_public_ipv6() and valid_ipv6s:
-        logger.debug(
-            flm(
-                f"Host has public IPv6. Prioritizing {len(valid_ipv6s)} IPv6 addresses.",
-                context.ident,
-                context.verbose,
+        if context.verbose > 0:
+            logger.debug(
+                flm(
+                    f"Host has public IPv6. Prioritizing {len(valid_ipv6s)} IPv6 addresses.",
+                    context.ident,
+                    context.verbose,
+                )
             )
-        )
-        random.shuffle(valid_ipv6s)
-        final_ip_list.extend(valid_ipv6s)
-
-    if valid_ipv4s:
-        random.shuffle(valid_ipv4s)
-        final_ip_list.extend(valid_ipv4s)
-
-    # Fallback to IPv6 if it's all we have and wasn't prioritized
-    if not final_ip_list and valid_ipv6s:
-        random.shuffle(valid_ipv6s)
-        final_ip_list.extend(valid_ipv6s)
+        # Alternate the address families (RFC 8305, section 4) so a broken
+        # IPv6 path delays the first IPv4 attempt by one stagger step rather
+        # than one step per IPv6 address.
+        final_ip_list = [
+            ip
+            for pair in zip_longest(valid_ipv6s, valid_ipv4s)
+            for ip in pair
+            if ip is not None
+        ]
+    else:
+        # Fallback to IPv6 if it's all we have and wasn't prioritized
+        final_ip_list = valid_ipv4s or valid_ipv6s
 
     if not final_ip_list:
         raise PermissionError(
@@ -156,19 +335,20 @@ async def _resolve_and_validate_host(
         )
 
     # Update cache with TTL-based expiration
-    ttl_expiration = time.time() + min_ttl
-    DNS_CACHE[host] = (final_ip_list, time.time(), ttl_expiration)
-    logger.debug(
-        flm(
-            (
-                f"DNS cache miss for '{host}'. "
-                f"Resolved to {final_ip_list} with TTL {min_ttl}s. Caching until {ttl_expiration}. "
-                f"({len(DNS_CACHE)} hosts cached)"
-            ),
-            context.ident,
-            context.verbose,
+    min_ttl = min(max(min_ttl, DNS_MIN_TTL), DNS_MAX_TTL)
+    DNS_CACHE.set(host, final_ip_list, min_ttl)
+    if context.verbose > 0:
+        logger.debug(
+            flm(
+                (
+                    f"DNS cache miss for '{host}'. "
+                    f"Resolved to {final_ip_list} with TTL {min_ttl}s. "
+                    f"({len(DNS_CACHE)} hosts cached)"
+                ),
+                context.ident,
+                context.verbose,
+            )
         )
-    )
     return final_ip_list
 
 
@@ -195,47 +375,45 @@ async def _create_fastest_connection(
     last_error = None
 
     for attempt in range(max_attempts):
-        logger.debug(
-            flm(
-                f"Connection attempt {attempt + 1}/{max_attempts} to {ip_list}",
-                context.ident,
-                context.verbose,
+        if context.verbose > 0:
+            logger.debug(
+                flm(
+                    f"Connection attempt {attempt + 1}/{max_attempts} to {ip_list}",
+                    context.ident,
+                    context.verbose,
+                )
             )
-        )
 
-        tasks = {
-            asyncio.create_task(
-                asyncio.wait_for(
-                    asyncio.open_connection(ip, port), timeout=timeout
-                ),
-                name=ip,
-            )
-            for ip in ip_list
-        }
+        ips = iter(ip_list)
+        next_ip = next(ips, None)
+        tasks: set[asyncio.Task] = set()
+
+        # Inner loop for the "Happy Eyeballs" race: start one connection at
+        # a time and launch the next one as soon as an attempt fails or
+        # HAPPY_EYEBALLS_DELAY passes without a result.
+        while next_ip is not None or tasks:
+            if next_ip is not None:
+                tasks.add(
+                    asyncio.create_task(
+                        asyncio.wait_for(
+                            asyncio.open_connection(next_ip, port),
+                            timeout=timeout,
+                        ),
+                        name=next_ip,
+                    )
+                )
+                next_ip = next(ips, None)
 
-        # Inner loop for the "Happy Eyeballs" race
-        while tasks:
-            done, pending = await asyncio.wait(
-                tasks, return_when=asyncio.FIRST_COMPLETED
+            done, tasks = await asyncio.wait(
+                tasks,
+                timeout=HAPPY_EYEBALLS_DELAY if next_ip is not None else None,
+                return_when=asyncio.FIRST_COMPLETED,
             )
 
+            winner = None
             for task in done:
                 try:
-                    reader, writer = task.result()
-                    # On success, cancel pending tasks and return the connection
-                    for p_task in pending:
-                        p_task.cancel()
-                    if pending:
-                        await asyncio.gather(*pending, return_exceptions=True)
-                    peer = writer.get_extra_info("peername")
-                    logger.debug(
-                        flm(
-                            f"Successfully established fastest connection to {peer[0]}:{peer[1]}",
-                            context.ident,
-                            context.verbose,
-                        )
-                    )
-                    return reader, writer
+                    connection = task.result()
                 except (
                     OSError,
                     asyncio.TimeoutError,
@@ -250,8 +428,34 @@ async def _create_fastest_connection(
                         )
                     )
                     last_error = e
-
-            tasks = pending
+                    continue
+                if winner is None:
+                    winner = connection
+                else:
+                    # Finished in the same round as the winner; not needed.
+                    connection[1].close()
+
+            if winner is not None:
+                # On success, cancel pending tasks and return the connection
+                for p_task in tasks:
+                    p_task.cancel()
+                for result in await asyncio.gather(
+                    *tasks, return_exceptions=True
+                ):
+                    if isinstance(result, tuple):
+                        # Connected before the cancellation landed.
+                        result[1].close()
+                reader, writer = winner
+                if context.verbose > 0:
+                    peer = writer.get_extra_info("peername")
+                    logger.debug(
+                        flm(
+                            f"Successfully established fastest connection to {peer[0]}:{peer[1]}",
+                            context.ident,
+                            context.verbose,
+                        )
+                    )
+                return reader, writer
 
         # If the inner loop finishes, all IPs failed in this attempt.
         # Wait before the next retry, if any.
@@ -318,7 +522,7 @@ async def process_https_tunnel(
         )
 
         # Signal the client that the tunnel is established.
-        client_writer.write(b"HTTP/1.1 200 Connection established\r\n\r\n")
+        client_writer.write(_CONNECTION_ESTABLISHED_RESPONSE)
         await client_writer.drain()
 
         # Use a TaskGroup for structured concurrency to relay data in both directions.
@@ -332,7 +536,7 @@ async def process_https_tunnel(
         logger.warning(
             flm(f"{method} 403 {uri} ({e})", context.ident, context.verbose)
         )
-        client_writer.write(b"HTTP/1.1 403 Forbidden\r\n\r\n")
+        client_writer.write(_FORBIDDEN_RESPONSE)
         await client_writer.drain()
 
     except Exception as e:
@@ -381,15 +585,18 @@ async def _send_http_request(
     Returns:
         tuple[asyncio.StreamReader, asyncio.StreamWriter]: A tuple of server reader and writer.
     """
-    request_line = f"{method} {path or '/'} {version}".encode()
-    headers_bytes = "\r\n".join(headers).encode()
+    # Encode the whole request head at once.
+    request_head = "\r\n".join(
+        (f"{method} {path or '/'} {version}", *headers, "", "")
+    ).encode()
     server_reader, server_writer = await _create_fastest_connection(
         ip_list, port, context, max_attempts=max_attempts
     )
 
-    server_writer.write(request_line + b"\r\n" + headers_bytes + b"\r\n\r\n")
-    if payload:
-        server_writer.write(payload)
+    # Hand over the head and payload as separate buffers. On Python 3.12+
+    # selector transports send them with one sendmsg() call without first
+    # copying the payload into a joined buffer.
+    server_writer.writelines((request_head, payload))
     await server_writer.drain()
 
     return server_reader, server_writer
@@ -436,11 +643,7 @@ async def process_http_request(
     try:
         # --- Determine target host and path ---
         host_header = next(
-            (
-                h.split(": ", 1)[1]
-                for h in headers
-                if h.lower().startswith("host:")
-            ),
+            (h.split(": ", 1)[1] for h in headers if h[:5].lower() == "host:"),
             None,
         )
 
@@ -454,11 +657,11 @@ async def process_http_request(
                 host_header = host_part
                 path = "/" + "/".join(uri.split("/")[3:])
             except IndexError:
-                client_writer.write(b"HTTP/1.1 400 Bad Request\r\n\r\n")
+                client_writer.write(_BAD_REQUEST_RESPONSE)
                 await client_writer.drain()
                 return
         else:
-            client_writer.write(b"HTTP/1.1 400 Bad Request\r\n\r\n")
+            client_writer.write(_BAD_REQUEST_RESPONSE)
             await client_writer.drain()
             return
 
@@ -476,15 +679,11 @@ async def process_http_request(
             )
 
             # Prepare headers for HTTP/1.1
-            headers_v1_1 = [
-                h for h in headers if not h.lower().startswith("proxy-")
-            ]
-            if not any(h.lower().startswith("host:") for h in headers_v1_1):
+            headers_v1_1 = [h for h in headers if h[:6].lower() != "proxy-"]
+            if not any(h[:5].lower() == "host:" for h in headers_v1_1):
                 headers_v1_1.insert(0, f"Host: {host_header}")
             headers_v1_1 = [
-                h
-                for h in headers_v1_1
-                if not h.lower().startswith("connection:")
+                h for h in headers_v1_1 if h[:11].lower() != "connection:"
             ]
             headers_v1_1.append("Connection: close")
 
@@ -519,12 +718,12 @@ async def process_http_request(
 
                 # Attempt 2: Fallback to original HTTP/1.0
                 original_headers = [
-                    h for h in headers if not h.lower().startswith("proxy-")
+                    h for h in headers if h[:6].lower() != "proxy-"
                 ]
                 original_headers = [
                     h
                     for h in original_headers
-                    if not h.lower().startswith("connection:")
+                    if h[:11].lower() != "connection:"
                 ]
                 original_headers.append("Connection: close")
 
@@ -541,17 +740,13 @@ async def process_http_request(
                 )
         else:
             # Original request was already HTTP/1.1 or newer
-            final_headers = [
-                h for h in headers if not h.lower().startswith("proxy-")
-            ]
+            final_headers = [h for h in headers if h[:6].lower() != "proxy-"]
 
-            if not any(h.lower().startswith("host:") for h in final_headers):
+            if not any(h[:5].lower() == "host:" for h in final_headers):
                 final_headers.insert(0, f"Host: {host_header}")
 
             final_headers = [
-                h
-                for h in final_headers
-                if not h.lower().startswith("connection:")
+                h for h in final_headers if h[:11].lower() != "connection:"
             ]
 
             final_headers.append("Connection: close")
@@ -594,7 +789,7 @@ async def process_http_request(
         logger.warning(
             flm(f"{method} 403 {uri} ({e})", context.ident, context.verbose)
         )
-        client_writer.write(b"HTTP/1.1 403 Forbidden\r\n\r\n")
+        client_writer.write(_FORBIDDEN_RESPONSE)
         await client_writer.drain()
 
     except Exception as e:
@@ -605,7 +800,7 @@ async def process_http_request(
             logger.error(msg)
         if not client_writer.is_closing():
             try:
-                client_writer.write(b"HTTP/1.1 502 Bad Gateway\r\n\r\n")
+                client_writer.write(_BAD_GATEWAY_RESPONSE)
                 await client_writer.drain()
             except ConnectionError:
                 pass  # Ignore if client is already closed
@@ -639,7 +834,14 @@ async def parse_request(
         header_bytes = await asyncio.wait_for(
             client_reader.readuntil(b"\r\n\r\n"), timeout=5.0
         )
-    except (asyncio.IncompleteReadError, asyncio.TimeoutError) as e:
+    except (
+        asyncio.IncompleteReadError,
+        asyncio.LimitOverrunError,
+        asyncio.TimeoutError,
+        ConnectionError,
+    ) as e:
+        # Covers clients that hang up, stall, or send a header block larger
+        # than the reader's buffer limit.
         logger.debug(
             flm(
                 f"Failed to read initial request: {e}",
@@ -660,7 +862,7 @@ async def parse_request(
     if content_length := get_content_length(header_str):
         try:
             payload = await client_reader.readexactly(content_length)
-        except asyncio.IncompleteReadError:
+        except (asyncio.IncompleteReadError, ConnectionError):
             logger.debug(
                 flm(f"Incomplete payload read.", context.ident, context.verbose)
             )
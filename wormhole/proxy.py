@@ -19,7 +19,9 @@ from argparse import ArgumentParser, Namespace
 from pathlib import Path
 from types import ModuleType
 import asyncio
+import os
 import signal
+import socket
 
 uvloop: ModuleType | None = None
 try:
@@ -119,6 +121,7 @@ async def main_async(args: Namespace) -> None:
         args.auth,
         args.verbose,
         args.allow_private,
+        reuse_port=args.workers > 1,
     )
 
     # Log the server startup completion, 000000 means internal server ID.
@@ -152,17 +155,12 @@ async def main_async(args: Namespace) -> None:
     )
 
 
-def main() -> int:
+def _build_parser() -> ArgumentParser:
     """
-    Parses command-line arguments and starts the event loop.
-
-    This function handles the main execution flow of the Wormhole proxy server.
-    It parses command-line arguments, sets up logging, and initializes the server.
-    If the server is not in update mode, it runs the main server loop asynchronously.
-    If in update mode, it updates the ad-block database and exits.
+    Builds the command-line argument parser.
 
     Returns:
-        int: The exit code of the script.
+        ArgumentParser: The parser for Wormhole's command-line options.
     """
     parser = ArgumentParser(
         description=f"Wormhole ({VERSION}): Asynchronous I/O HTTP/S Proxy"
@@ -204,6 +202,13 @@ def main() -> int:
         action="store_true",
         help="Print license information and exit",
     )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of server processes sharing the port via SO_REUSEPORT [default: %(default)d]",
+    )
     parser.add_argument(
         "-v",
         "--verbose",
@@ -255,6 +260,22 @@ def main() -> int:
         default=None,
         help="Path to a file of domains to extend the default allowlist.",
     )
+    return parser
+
+
+def main() -> int:
+    """
+    Parses command-line arguments and starts the event loop.
+
+    This function handles the main execution flow of the Wormhole proxy server.
+    It parses command-line arguments, sets up logging, and initializes the server.
+    If the server is not in update mode, it runs the main server loop asynchronously.
+    If in update mode, it updates the ad-block database and exits.
+
+    Returns:
+        int: The exit code of the script.
+    """
+    parser = _build_parser()
     args = parser.parse_args()
 
     # --- Utility Command Handling ---
@@ -324,6 +345,27 @@ def main() -> int:
     if args.auth and not Path(args.auth).is_file():
         parser.error(f"Authentication file not found: {args.auth}")
 
+    if args.workers < 1:
+        parser.error("Number of workers must be at least 1.")
+
+    if args.workers > 1:
+        if not (hasattr(os, "fork") and hasattr(socket, "SO_REUSEPORT")):
+            parser.error("Multiple workers require fork() and SO_REUSEPORT.")
+        return _run_workers(args)
+
+    return _run_server(args)
+
+
+def _run_server(args: Namespace) -> int:
+    """
+    Runs the server event loop in the current process until shutdown.
+
+    Args:
+        args (Namespace): The parsed command-line arguments.
+
+    Returns:
+        int: The exit code of the server.
+    """
     try:
         if uvloop and hasattr(uvloop, "run"):
             # Use the new uvloop.run() method for Python 3.12+
@@ -341,5 +383,55 @@ def main() -> int:
     return 0
 
 
+def _run_workers(args: Namespace) -> int:
+    """
+    Forks one server process per worker and waits for all of them to exit.
+
+    Every worker binds the same address with SO_REUSEPORT, so the kernel
+    spreads incoming connections across them. Caches such as the DNS cache
+    are per worker. SIGINT and SIGTERM sent to the parent are forwarded to
+    the workers, which then shut down gracefully.
+
+    Args:
+        args (Namespace): The parsed command-line arguments.
+
+    Returns:
+        int: 0 if every worker exited cleanly, 1 otherwise.
+    """
+    children: list[int] = []
+    for _ in range(args.workers):
+        pid = os.fork()
+        if pid == 0:
+            # Never return into the parent's code path from a worker.
+            exit_code = 1
+            try:
+                exit_code = _run_server(args)
+            finally:
+                # os._exit() skips the stdio flush a normal exit does, so a
+                # worker's last messages would be lost when output is piped.
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(exit_code)
+        children.append(pid)
+
+    def _forward_signal(signum, frame):
+        """Passes a shutdown signal on to every worker."""
+        for pid in children:
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass  # That worker has already exited.
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, _forward_signal)
+
+    exit_code = 0
+    for pid in children:
+        _, status = os.waitpid(pid, 0)
+        if os.waitstatus_to_exitcode(status) != 0:
+            exit_code = 1
+    return exit_code
+
+
 if __name__ == "__main__":
     sys.exit(main())
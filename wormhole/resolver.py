@@ -156,10 +156,10 @@ class Resolver:
         # Create a specific ident for this resolution request
         ident = {"id": "resolver", "client": hostname}
 
-        # Lazily initialize the resolver on first use to attach to the correct event loop.
+        # Lazily initialize the resolver on first use so it attaches to the
+        # running event loop (asyncio, uvloop or winloop) on its own.
         if self.resolver is None:
-            loop = asyncio.get_running_loop()
-            self.resolver = aiodns.DNSResolver(loop=loop)
+            self.resolver = aiodns.DNSResolver()
 
         hostname_lower = hostname.lower()
         # 1. Check hosts file cache
@@ -69,6 +69,7 @@ def has_public_ipv6() -> bool:
             s.close()
 
 
+@lru_cache(maxsize=4096)
 def is_private_ip(ip_str: str) -> bool:
     """
     Checks if a given IP address string is a private, reserved, or loopback address.
@@ -121,6 +122,9 @@ async def load_ad_block_db(
             )
         )
 
+    # Verdicts cached before the load may no longer hold.
+    is_ad_domain.cache_clear()
+
     if AD_BLOCK_SET:
         # Calculate the total memory usage for the set and its contents
         set_size = sys.getsizeof(AD_BLOCK_SET)
@@ -162,14 +166,21 @@ def load_allowlist(path: str, host: str, context: RequestContext) -> int:
                 context.verbose,
             )
         )
+    # Verdicts cached before the load may no longer hold.
+    is_ad_domain.cache_clear()
     return len(ALLOW_LIST_SET)
 
 
+@lru_cache(maxsize=4096)
 def is_ad_domain(hostname: str) -> bool:
     """
     Checks if a hostname is blocked using a more specific block/allow logic.
     The blocklist is checked before the allowlist to allow for more granular control.
 
+    Results are cached, so callers that change AD_BLOCK_SET or ALLOW_LIST_SET
+    directly must call is_ad_domain.cache_clear() afterwards; the loaders in
+    this module do so themselves.
+
     The order of checks is:
     1. Exact match in blocklist -> Block
     2. Exact match in allowlist -> Allow
@@ -197,9 +208,15 @@ def is_ad_domain(hostname: str) -> bool:
     # --- Third Priority: Check for parent domains in the blocklist ---
     # This blocks subdomains of a blocked parent (e.g., if 'ad-server.com'
     # is blocked, 'analytics.ad-server.com' will also be blocked).
-    parts = hostname_lower.split(".")
-    for i in range(1, len(parts)):
-        parent_domain = ".".join(parts[i:])
+    # Each parent domain is the suffix after a dot, so slice them out once
+    # instead of splitting and re-joining labels for both passes.
+    parent_domains = []
+    dot = hostname_lower.find(".")
+    while dot != -1:
+        parent_domains.append(hostname_lower[dot + 1 :])
+        dot = hostname_lower.find(".", dot + 1)
+
+    for parent_domain in parent_domains:
         if parent_domain in AD_BLOCK_SET:
             return True
 
@@ -207,8 +224,7 @@ def is_ad_domain(hostname: str) -> bool:
     # This allows subdomains of an allowed parent (e.g., if 'x.com' is
     # allowed, 'www.x.com' will also be allowed), unless the subdomain
     # itself was caught by the blocklist checks above.
-    for i in range(1, len(parts)):
-        parent_domain = ".".join(parts[i:])
+    for parent_domain in parent_domains:
         if parent_domain in ALLOW_LIST_SET:
             return False
 
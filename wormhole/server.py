@@ -178,6 +178,7 @@ async def start_wormhole_server(
     auth_file_path: str | None,
     verbose: int = 0,
     allow_private: bool = False,
+    reuse_port: bool = False,
 ) -> asyncio.Server:
     """
     Initializes and starts the main proxy server.
@@ -188,6 +189,7 @@ async def start_wormhole_server(
         auth_file_path (str | None): Path to the authentication file.
         verbose (int, optional): Verbosity level of logging. Defaults to 0.
         allow_private (bool, optional): Whether to allow private connections. Defaults to False.
+        reuse_port (bool, optional): Whether to bind with SO_REUSEPORT so several worker processes can share the port. Defaults to False.
 
     Returns:
         asyncio.Server: The server instance.
@@ -207,7 +209,12 @@ async def start_wormhole_server(
         # Increase the buffer limit to handle large HTTP headers
         # Default is 2^16 (64KB), we're increasing it to 2^18 (256KB)
         server = await asyncio.start_server(
-            connection_handler, host, port, family=family, limit=262144
+            connection_handler,
+            host,
+            port,
+            family=family,
+            limit=262144,
+            reuse_port=reuse_port,
         )
 
         # Log the addresses the server is listening on.
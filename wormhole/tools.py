@@ -1,8 +1,5 @@
 import re
 
-# Regex patterns for extracting host and port from a string
-REGEX_HOST = re.compile(r"(.+?):([0-9]{1,5})")
-
 
 def get_host_and_port(
     hostname: str, default_port: str | None = None
@@ -10,6 +7,9 @@ def get_host_and_port(
     """
     Extracts the host and port from a hostname string.
 
+    Bracketed IPv6 literals (e.g. "[2001:db8::1]:443") are supported and
+    returned without brackets. A bare IPv6 address is treated as having no port.
+
     Args:
         hostname (str): The hostname string to extract host and port from.
         default_port (str | None, optional): The default port to use if no port
@@ -18,9 +18,16 @@ def get_host_and_port(
     Returns:
         tuple[str, int]: A tuple containing the host and port.
     """
-    if match := REGEX_HOST.search(hostname):
-        return match.group(1), int(match.group(2))
-    return hostname, int(default_port or "80")
+    host, sep, port = hostname.rpartition(":")
+    if (
+        sep
+        and port.isascii()
+        and port.isdigit()
+        and len(port) <= 5
+        and (host.endswith("]") or ":" not in host)
+    ):
+        return host.strip("[]"), int(port)
+    return hostname.strip("[]"), int(default_port or "80")
 
 
 # Regex pattern for extracting Content-Length from HTTP headers